@@ -7,10 +7,17 @@ Account Analyzer MCP Server - Enterprise账号分析 (多客户版本)
 """
 
 import csv
+import hashlib
+import heapq
+import json
 import os
 import re
-from collections import defaultdict
+import sys
+from bisect import bisect_left
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import attrgetter, itemgetter, mul
 from typing import Dict, List, Set, Tuple, Optional
 from mcp.server.fastmcp import FastMCP
 from pydantic import Field
@@ -41,6 +48,7 @@ mcp = FastMCP(
     - `get_available_dates_tool`: 获取指定客户的所有可用数据日期
     - `analyze_single_date_accounts`: 分析指定客户在特定日期的Enterprise账号情况
     - `get_detailed_linked_changes`: 获取详细的Enterprise Linked账号变化信息
+    - `clear_data_cache`: 清空数据缓存（数据文件更新后会自动失效，通常无需手动调用）
 
     ### 🆕 深度业务分析工具 
     - `analyze_payer_detailed_distribution`: 深度分析Payer账号分布和每个Payer的详细特征
@@ -154,39 +162,90 @@ mcp = FastMCP(
 
 class AccountRecord:
     """账号记录类"""
+    # 每行CSV对应一个实例，使用 __slots__ 省去每个实例的 __dict__，降低大文件的内存占用
+    __slots__ = (
+        "account_name", "account_id", "support_level", "status",
+        "linked_accounts", "account_type", "payer_id", "tags",
+        "_support_level_key", "level_idx", "role_idx",
+    )
+    
+    # 统一大写后的支持级别到整数下标的映射，其他取值的下标为 4
+    LEVEL_INDEX = {"ENTERPRISE": 0, "BUSINESS": 1, "DEVELOPER": 2, "BASIC": 3}
+    # 账号类型到整数下标的映射，其他取值的下标为 2
+    ROLE_INDEX = {"PAYER_ACCOUNT": 0, "LINKED_ACCOUNT": 1}
+    
+    # 与 __slots__ 一一对应的CSV列名
+    CSV_COLUMNS = (
+        "Account Name", "Account ID", "Support Level", "Status",
+        "Linked Accounts", "Account Type", "Payer ID", "Tags",
+    )
+    
     def __init__(self, row: Dict[str, str]):
+        # 与 from_csv_row 一致，驻留取值重复度高的字段
+        intern = sys.intern
         self.account_name = row.get("Account Name", "").strip('"')
-        self.account_id = row.get("Account ID", "").strip('"')
-        self.support_level = row.get("Support Level", "").strip('"')
-        self.status = row.get("Status", "").strip('"')
+        self.account_id = intern(row.get("Account ID", "").strip('"'))
+        self.support_level = intern(row.get("Support Level", "").strip('"'))
+        self.status = intern(row.get("Status", "").strip('"'))
         self.linked_accounts = row.get("Linked Accounts", "").strip('"')
-        self.account_type = row.get("Account Type", "").strip('"')
-        self.payer_id = row.get("Payer ID", "").strip('"')
+        self.account_type = intern(row.get("Account Type", "").strip('"'))
+        self.payer_id = intern(row.get("Payer ID", "").strip('"'))
         self.tags = row.get("Tags", "").strip('"')
+        # 构建时统一转换一次大写，is_* 判断不再每次调用 upper()
+        self._support_level_key = intern(self.support_level.upper())
+        # 构建时确定支持级别和账号类型的整数下标，分组统计时直接按下标累加
+        self.level_idx = self.LEVEL_INDEX.get(self._support_level_key, 4)
+        self.role_idx = self.ROLE_INDEX.get(self.account_type, 2)
+    
+    @classmethod
+    def from_csv_row(cls, row: List[str], column_indices: Tuple[Optional[int], ...]) -> "AccountRecord":
+        """按列位置从 csv.reader 的行构建账号记录，缺失的列视为空字符串"""
+        width = len(row)
+        (account_name, account_id, support_level, status,
+         linked_accounts, account_type, payer_id, tags) = [
+            row[index].strip('"') if index is not None and index < width else ""
+            for index in column_indices
+        ]
+        
+        # 取值重复度高的字段驻留为同一字符串对象，大文件和跨日期缓存时显著减少内存占用
+        intern = sys.intern
+        account = cls.__new__(cls)
+        account.account_name = account_name
+        account.account_id = intern(account_id)
+        account.support_level = intern(support_level)
+        account.status = intern(status)
+        account.linked_accounts = linked_accounts
+        account.account_type = intern(account_type)
+        account.payer_id = intern(payer_id)
+        account.tags = tags
+        account._support_level_key = intern(support_level.upper())
+        account.level_idx = cls.LEVEL_INDEX.get(account._support_level_key, 4)
+        account.role_idx = cls.ROLE_INDEX.get(account.account_type, 2)
+        return account
     
     def is_enterprise(self) -> bool:
         """检查是否为Enterprise级别"""
-        return self.support_level.upper() == "ENTERPRISE"
+        return self.level_idx == 0
     
     def is_business(self) -> bool:
         """检查是否为Business级别"""
-        return self.support_level.upper() == "BUSINESS"
+        return self.level_idx == 1
     
     def is_developer(self) -> bool:
         """检查是否为Developer级别"""
-        return self.support_level.upper() == "DEVELOPER"
+        return self.level_idx == 2
     
     def is_basic(self) -> bool:
         """检查是否为Basic级别"""
-        return self.support_level.upper() == "BASIC"
+        return self.level_idx == 3
     
     def is_payer(self) -> bool:
         """检查是否为Payer账号"""
-        return self.account_type == "PAYER_ACCOUNT"
+        return self.role_idx == 0
     
     def is_linked(self) -> bool:
         """检查是否为Linked账号"""
-        return self.account_type == "LINKED_ACCOUNT"
+        return self.role_idx == 1
     
     def __str__(self):
         return f"{self.account_name} ({self.account_id})"
@@ -195,21 +254,30 @@ class AccountRecord:
 
 def get_available_customers() -> List[str]:
     """获取所有可用的客户列表"""
-    customers = []
-    if not os.path.exists(DATA_ROOT_DIR):
-        return customers
+    try:
+        root_stat = os.stat(DATA_ROOT_DIR)
+    except FileNotFoundError:
+        return []
     
-    for item in os.listdir(DATA_ROOT_DIR):
-        item_path = os.path.join(DATA_ROOT_DIR, item)
-        if os.path.isdir(item_path) and not item.startswith('.'):
-            customers.append(item)
+    # 以目录修改时间作为缓存键，新增/删除客户目录后自动失效
+    return list(_scan_customers(DATA_ROOT_DIR, root_stat.st_mtime_ns))
+
+@lru_cache(maxsize=8)
+def _scan_customers(root_dir: str, mtime_ns: int) -> Tuple[str, ...]:
+    """扫描数据根目录下的客户文件夹（结果按目录修改时间缓存）"""
+    # scandir 直接返回目录项类型，不再对每一项单独调用 stat
+    with os.scandir(root_dir) as entries:
+        customers = [entry.name for entry in entries if not entry.name.startswith('.') and entry.is_dir()]
     
-    return sorted(customers)
+    return tuple(sorted(customers))
 
 def get_customer_data_dir(customer: str) -> str:
     """获取指定客户的数据目录路径"""
     return os.path.join(DATA_ROOT_DIR, customer)
 
+# MMDD 格式日期对应的数据文件年份
+DEFAULT_DATA_YEAR = "2025"
+
 def normalize_date_format(date_str: str) -> str:
     """
     标准化日期格式，统一转换为 MMDD 格式用于内部处理
@@ -234,7 +302,7 @@ def expand_date_format(date_str: str) -> List[str]:
     """
     if len(date_str) == 4:
         # MMDD 格式，生成对应的 YYYYMMDD 格式
-        return [date_str, f"2025{date_str}"]
+        return [date_str, f"{DEFAULT_DATA_YEAR}{date_str}"]
     elif len(date_str) == 8:
         # YYYYMMDD 格式，提取 MMDD 部分
         mmdd = date_str[4:]
@@ -244,77 +312,158 @@ def expand_date_format(date_str: str) -> List[str]:
 
 def get_available_dates(customer: str) -> List[str]:
     """获取指定客户所有可用的数据日期，统一返回 MMDD 格式"""
-    dates = []
-    customer_dir = get_customer_data_dir(customer)
-    
-    if not os.path.exists(customer_dir):
-        return dates
-    
-    # 支持多种文件名格式
-    patterns = [
-        re.compile(rf'{re.escape(customer)}-CMC-accounts-(\d{{4}})\.csv'),  # customer-CMC-accounts-0731.csv
-        re.compile(rf'{re.escape(customer)}-CMC-accounts-(\d{{8}})\.csv'),  # customer-CMC-accounts-20250731.csv
-        re.compile(rf'{re.escape(customer)}-accounts-(\d{{4}})\.csv'),  # customer-accounts-0731.csv
-        re.compile(rf'{re.escape(customer)}-accounts-(\d{{8}})\.csv'),  # customer-accounts-20250731.csv
-        re.compile(r'accounts-(\d{4})\.csv'),  # accounts-0731.csv (MMDD格式)
-        re.compile(r'accounts-(\d{8})\.csv'),  # accounts-20250513.csv (YYYYMMDD格式)
-        re.compile(r'CMC-accounts-(\d{4})\.csv'),  # CMC-accounts-0731.csv
-        re.compile(r'CMC-accounts-(\d{8})\.csv'),  # CMC-accounts-20250513.csv
-    ]
-    
-    for filename in os.listdir(customer_dir):
-        for pattern in patterns:
-            match = pattern.match(filename)
-            if match:
-                raw_date = match.group(1)
-                # 标准化为 MMDD 格式
-                normalized_date = normalize_date_format(raw_date)
-                if normalized_date not in dates:
-                    dates.append(normalized_date)
-                break
-    
-    return sorted(dates)
-
-def load_accounts_data(customer: str, date: str) -> List[AccountRecord]:
-    """加载指定客户指定日期的账号数据"""
-    customer_dir = get_customer_data_dir(customer)
-    
-    # 生成可能的日期格式
-    date_formats = expand_date_format(date)
-    
-    # 尝试多种文件名格式
-    possible_filenames = []
-    for date_fmt in date_formats:
-        possible_filenames.extend([
-            f"{customer}-CMC-accounts-{date_fmt}.csv",
-            f"{customer}-accounts-{date_fmt}.csv",  # 新增支持
-            f"accounts-{date_fmt}.csv",
-            f"CMC-accounts-{date_fmt}.csv",
-        ])
-    
-    filepath = None
-    for filename in possible_filenames:
-        test_path = os.path.join(customer_dir, filename)
-        if os.path.exists(test_path):
-            filepath = test_path
-            break
+    return sorted(_customer_file_index(customer))
+
+@lru_cache(maxsize=128)
+def _date_file_pattern(customer: str) -> re.Pattern:
+    """
+    获取客户数据文件名的预编译正则（每个客户只编译一次）
+    合并支持的文件名格式（第1组为文件名前缀，第2组为日期）：
+    - {customer}-CMC-accounts-0731.csv / {customer}-CMC-accounts-20250731.csv
+    - {customer}-accounts-0731.csv / {customer}-accounts-20250731.csv
+    - CMC-accounts-0731.csv / CMC-accounts-20250513.csv
+    - accounts-0731.csv / accounts-20250513.csv
+    """
+    return re.compile(rf'((?:{re.escape(customer)}-)?(?:CMC-)?)accounts-(\d{{4}}|\d{{8}})\.csv')
+
+def _customer_file_index(customer: str) -> Dict[str, str]:
+    """获取指定客户的数据文件索引 {MMDD日期: 文件路径}（调用方不应修改返回值）"""
+    return _customer_file_indexes(customer)[1]
+
+def _customer_file_indexes(customer: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """获取指定客户的 ({文件名中的原始日期: 文件路径}, {MMDD日期: 文件路径}) 两个索引（调用方不应修改返回值）"""
+    try:
+        customer_stat = os.stat(get_customer_data_dir(customer))
+    except FileNotFoundError:
+        return {}, {}
+    
+    # 以目录修改时间作为缓存键，新增/删除数据文件后自动失效
+    return _scan_customer_files(customer, customer_stat.st_mtime_ns)
+
+@lru_cache(maxsize=128)
+def _scan_customer_files(customer: str, mtime_ns: int) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """一次扫描客户目录，建立原始日期和MMDD日期到数据文件的索引（结果按目录修改时间缓存）"""
+    pattern = _date_file_pattern(customer)
+    # 同一日期存在多个文件时的优先级，与原先逐个文件名探测的顺序一致
+    prefix_priority = {f"{customer}-CMC-": 0, f"{customer}-": 1, "": 2, "CMC-": 3}
+    
+    # 按文件名中的原始日期（MMDD 或 YYYYMMDD）建立索引，不同年份的文件互不覆盖
+    raw_index = {}
+    ranks = {}
+    with os.scandir(get_customer_data_dir(customer)) as entries:
+        for entry in entries:
+            # 整个文件名必须匹配，避免 .bak/.old 等备份文件被当作数据文件
+            match = pattern.fullmatch(entry.name)
+            if not match or not entry.is_file():
+                continue
+            
+            prefix, raw_date = match.groups()
+            rank = prefix_priority.get(prefix, len(prefix_priority))
+            if raw_date not in ranks or rank < ranks[raw_date]:
+                ranks[raw_date] = rank
+                raw_index[raw_date] = entry.path
+    
+    # MMDD 索引与 expand_date_format 的顺序一致：MMDD 文件优先，其次默认年份的 YYYYMMDD，
+    # 其他年份按年份从新到旧，结果与目录遍历顺序无关
+    def date_rank(raw_date: str) -> Tuple[int, int]:
+        if len(raw_date) == 4:
+            return (0, 0)
+        if raw_date[:4] == DEFAULT_DATA_YEAR:
+            return (1, 0)
+        return (2, -int(raw_date[:4]))
+    
+    index = {}
+    for raw_date in sorted(raw_index, key=date_rank):
+        index.setdefault(raw_date[-4:], raw_index[raw_date])
+    
+    return raw_index, index
+
+def load_accounts_data(customer: str, date: str) -> Tuple[AccountRecord, ...]:
+    """加载指定客户指定日期的账号数据（解析结果会被缓存共享，调用方不应修改返回值）"""
+    return _parse_accounts_file(*_locate_accounts_file(customer, date))
+
+def _locate_accounts_file(customer: str, date: str) -> Tuple[str, int, int]:
+    """定位指定客户指定日期的数据文件，返回 (文件路径, 修改时间, 文件大小) 作为缓存键"""
+    raw_index, file_index = _customer_file_indexes(customer)
+    if len(date) == 8:
+        # 完整的 YYYYMMDD 只匹配该年份的文件或不带年份的 MMDD 文件，不能换成其他年份的数据
+        filepath = raw_index.get(date) or raw_index.get(date[4:])
+    else:
+        filepath = file_index.get(normalize_date_format(date))
     
     if not filepath:
-        raise FileNotFoundError(f"找不到客户 {customer} 日期 {date} 的数据文件。尝试的文件名: {possible_filenames}")
-    
-    accounts = []
-    with open(filepath, 'r', encoding='utf-8-sig') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            account = AccountRecord(row)
-            accounts.append(account)  # 加载所有账号，不再只限制Enterprise
-    
-    return accounts
+        available = ', '.join(sorted(file_index)) or '无'
+        raise FileNotFoundError(f"找不到客户 {customer} 日期 {date} 的数据文件。可用日期: {available}")
+    
+    # 文件修改时间和大小参与缓存键，数据文件被覆盖更新后自动重新解析
+    file_stat = os.stat(filepath)
+    return filepath, file_stat.st_mtime_ns, file_stat.st_size
+
+@lru_cache(maxsize=256)
+def _parse_accounts_file(filepath: str, mtime_ns: int, size: int) -> Tuple[AccountRecord, ...]:
+    """解析账号CSV文件，每个文件版本只解析一次"""
+    with open(filepath, 'r', encoding='utf-8-sig', newline='') as file:
+        # 使用 csv.reader 按列位置取值，避免 DictReader 为每行构建字典
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return ()
+        
+        # 列名重复时与 DictReader 一致，以最后一列为准
+        positions = {name: index for index, name in enumerate(header)}
+        column_indices = tuple(positions.get(column) for column in AccountRecord.CSV_COLUMNS)
+        
+        # 加载所有账号，不再只限制Enterprise；与 DictReader 一致跳过空行
+        from_csv_row = AccountRecord.from_csv_row
+        return tuple(from_csv_row(row, column_indices) for row in reader if row)
+
+@lru_cache(maxsize=256)
+def _payer_names_index(filepath: str, mtime_ns: int, size: int) -> Dict[str, str]:
+    """建立单个数据文件的 {Payer ID: Payer名称} 索引，与文件解析结果使用相同的缓存键"""
+    names = {}
+    for account in _parse_accounts_file(filepath, mtime_ns, size):
+        if account.is_payer():
+            # 同一ID出现多次时与线性查找一致，以第一条为准
+            names.setdefault(account.account_id, account.account_name)
+    return names
+
+def clear_data_caches() -> None:
+    """清空所有数据缓存（客户列表、日期列表和已解析的账号数据）"""
+    _scan_customers.cache_clear()
+    _scan_customer_files.cache_clear()
+    _parse_accounts_file.cache_clear()
+    _payer_names_index.cache_clear()
+    _analyze_enterprise_file.cache_clear()
+    _analyze_accounts_file.cache_clear()
+    _build_appearance_index.cache_clear()
+    _build_linked_diff.cache_clear()
 
 def load_enterprise_accounts_data(customer: str, date: str) -> List[AccountRecord]:
     """加载指定客户指定日期的Enterprise账号数据（保持向后兼容）"""
-    all_accounts = load_accounts_data(customer, date)
-    return [account for account in all_accounts if account.is_enterprise()]
+    # 复用按文件版本缓存的Enterprise筛选结果，返回副本，调用方修改列表不会影响缓存
+    accounts, _ = load_enterprise_analysis(customer, date)
+    return list(accounts)
+
+def load_enterprise_analysis(customer: str, date: str) -> Tuple[Tuple[AccountRecord, ...], Dict]:
+    """加载指定客户指定日期的Enterprise账号及其分析结果（结果会被缓存共享，调用方不应修改返回值）"""
+    return _analyze_enterprise_file(*_locate_accounts_file(customer, date))
+
+@lru_cache(maxsize=256)
+def _analyze_enterprise_file(filepath: str, mtime_ns: int, size: int) -> Tuple[Tuple[AccountRecord, ...], Dict]:
+    """筛选并分析单个数据文件中的Enterprise账号，与文件解析结果使用相同的缓存键"""
+    # 与 _parse_accounts_file 一致以元组缓存，避免调用方修改共享结果
+    accounts = tuple(account for account in _parse_accounts_file(filepath, mtime_ns, size) if account.is_enterprise())
+    return accounts, analyze_enterprise_accounts(accounts)
+
+def load_all_accounts_analysis(customer: str, date: str) -> Tuple[Tuple[AccountRecord, ...], Dict]:
+    """加载指定客户指定日期的所有账号及其整体分析结果（结果会被缓存共享，调用方不应修改返回值）"""
+    return _analyze_accounts_file(*_locate_accounts_file(customer, date))
+
+@lru_cache(maxsize=256)
+def _analyze_accounts_file(filepath: str, mtime_ns: int, size: int) -> Tuple[Tuple[AccountRecord, ...], Dict]:
+    """分析单个数据文件中的所有账号，与文件解析结果使用相同的缓存键"""
+    accounts = _parse_accounts_file(filepath, mtime_ns, size)
+    return accounts, analyze_all_accounts(accounts)
 
 def parse_date_string(date_str: str) -> datetime:
     """将MMDD格式的日期字符串转换为datetime对象"""
@@ -339,41 +488,96 @@ def get_recent_dates(customer: str, days: int = 7) -> List[str]:
         except ValueError:
             continue
     
-    date_objects.sort(key=lambda x: x[1], reverse=True)
+    date_objects.sort(key=itemgetter(1), reverse=True)
     
     # 返回最近的N个日期
     return [date_str for date_str, _ in date_objects[:days]]
 
 def analyze_enterprise_accounts(accounts: List[AccountRecord]) -> Dict:
     """分析Enterprise账号数据"""
-    enterprise_accounts = [account for account in accounts if account.is_enterprise()]
+    total_enterprise = 0
     payer_accounts = []
     linked_accounts = []
     payer_to_linked = defaultdict(list)
+    # 按账号ID索引，两个日期对比时直接按ID查找和求差集
+    payers_by_id = {}
+    linked_by_id = {}
     
-    for account in enterprise_accounts:
+    # 单次遍历完成Enterprise过滤、类型分类和Payer分组，不再生成中间列表
+    for account in accounts:
+        if not account.is_enterprise():
+            continue
+        
+        total_enterprise += 1
         if account.is_payer():
             payer_accounts.append(account)
+            payers_by_id[account.account_id] = account
         elif account.is_linked():
             linked_accounts.append(account)
+            linked_by_id[account.account_id] = account
             payer_to_linked[account.payer_id].append(account)
     
     return {
         "payer_accounts": payer_accounts,
         "linked_accounts": linked_accounts,
         "payer_to_linked": dict(payer_to_linked),
+        "payers_by_id": payers_by_id,
+        "linked_by_id": linked_by_id,
+        # 每个Payer下的Linked账号数量，报告中按Payer取数量时直接查询
+        "linked_counts": {payer_id: len(linked) for payer_id, linked in payer_to_linked.items()},
         "total_payers": len(payer_accounts),
         "total_linked": len(linked_accounts),
-        "total_accounts": len(enterprise_accounts)
+        "total_accounts": total_enterprise
     }
 
 def analyze_all_accounts(accounts: List[AccountRecord]) -> Dict:
     """分析所有账号数据（不限制支持级别）"""
-    # 按支持级别分类
-    support_level_stats = defaultdict(int)
-    account_type_stats = defaultdict(int)
-    status_stats = defaultdict(int)
+    # 按支持级别、账号类型和状态计数，由 Counter 在C层完成聚合
+    support_level_stats = Counter(map(attrgetter("support_level"), accounts))
+    account_type_stats = Counter(map(attrgetter("account_type"), accounts))
+    status_stats = Counter(map(attrgetter("status"), accounts))
+    # 按支持级别整数下标计数，与 is_enterprise() 等判断一致
+    level_counts = Counter(map(attrgetter("level_idx"), accounts))
+    
+    total_enterprise = level_counts[0]
+    total_business = level_counts[1]
+    total_developer = level_counts[2]
+    total_basic = level_counts[3]
     
+    # 账号分组列表一次遍历构建；整体分析结果按文件版本缓存，每个文件只分组一次
+    groups = _group_all_accounts(accounts)
+    
+    return {
+        "all_accounts": accounts,
+        "payer_accounts": groups["payer_accounts"],
+        "linked_accounts": groups["linked_accounts"],
+        "payer_to_linked": groups["payer_to_linked"],
+        "total_payers": account_type_stats[ACCOUNT_TYPE_CODES["PAYER"]],
+        "total_linked": account_type_stats[ACCOUNT_TYPE_CODES["LINKED"]],
+        "total_accounts": len(accounts),
+        
+        # 按支持级别分组
+        "enterprise_accounts": groups["enterprise_accounts"],
+        "business_accounts": groups["business_accounts"],
+        "developer_accounts": groups["developer_accounts"],
+        "basic_accounts": groups["basic_accounts"],
+        "other_accounts": groups["other_accounts"],
+        
+        # 统计信息
+        "support_level_stats": support_level_stats,
+        "account_type_stats": account_type_stats,
+        "status_stats": status_stats,
+        
+        # 支持级别计数
+        "total_enterprise": total_enterprise,
+        "total_business": total_business,
+        "total_developer": total_developer,
+        "total_basic": total_basic,
+        "total_other": level_counts[4]
+    }
+
+def _group_all_accounts(accounts: List[AccountRecord]) -> Dict:
+    """按账号类型和支持级别分组所有账号"""
     payer_accounts = []
     linked_accounts = []
     payer_to_linked = defaultdict(list)
@@ -385,58 +589,30 @@ def analyze_all_accounts(accounts: List[AccountRecord]) -> Dict:
     basic_accounts = []
     other_accounts = []
     
+    # 按 AccountRecord.level_idx 排列的分组列表，每个账号直接按下标归组
+    level_groups = (enterprise_accounts, business_accounts, developer_accounts, basic_accounts, other_accounts)
+    
     for account in accounts:
-        # 统计支持级别
-        support_level_stats[account.support_level] += 1
-        account_type_stats[account.account_type] += 1
-        status_stats[account.status] += 1
-        
         # 分类账号类型
-        if account.is_payer():
+        role_idx = account.role_idx
+        if role_idx == 0:
             payer_accounts.append(account)
-        elif account.is_linked():
+        elif role_idx == 1:
             linked_accounts.append(account)
             payer_to_linked[account.payer_id].append(account)
         
         # 按支持级别分组
-        if account.is_enterprise():
-            enterprise_accounts.append(account)
-        elif account.is_business():
-            business_accounts.append(account)
-        elif account.is_developer():
-            developer_accounts.append(account)
-        elif account.is_basic():
-            basic_accounts.append(account)
-        else:
-            other_accounts.append(account)
+        level_groups[account.level_idx].append(account)
     
     return {
-        "all_accounts": accounts,
         "payer_accounts": payer_accounts,
         "linked_accounts": linked_accounts,
         "payer_to_linked": dict(payer_to_linked),
-        "total_payers": len(payer_accounts),
-        "total_linked": len(linked_accounts),
-        "total_accounts": len(accounts),
-        
-        # 按支持级别分组
         "enterprise_accounts": enterprise_accounts,
         "business_accounts": business_accounts,
         "developer_accounts": developer_accounts,
         "basic_accounts": basic_accounts,
         "other_accounts": other_accounts,
-        
-        # 统计信息
-        "support_level_stats": dict(support_level_stats),
-        "account_type_stats": dict(account_type_stats),
-        "status_stats": dict(status_stats),
-        
-        # 支持级别计数
-        "total_enterprise": len(enterprise_accounts),
-        "total_business": len(business_accounts),
-        "total_developer": len(developer_accounts),
-        "total_basic": len(basic_accounts),
-        "total_other": len(other_accounts)
     }
 
 # ============ 基础分析工具 ============
@@ -453,19 +629,28 @@ def get_available_dates_tool(
         if not dates:
             return f"❌ 未找到客户 {customer} 的任何数据文件"
         
-        result = f"📅 **客户 {customer} 可用数据日期** ({len(dates)} 个):\n\n"
+        parts = [f"📅 **客户 {customer} 可用数据日期** ({len(dates)} 个):\n\n"]
         for date in dates:
             try:
                 dt = parse_date_string(date)
                 formatted_date = dt.strftime("%m月%d日")
-                result += f"- `{date}` ({formatted_date})\n"
+                parts.append(f"- `{date}` ({formatted_date})\n")
             except ValueError:
-                result += f"- `{date}` (格式异常)\n"
+                parts.append(f"- `{date}` (格式异常)\n")
         
-        return result
+        return "".join(parts)
     except Exception as e:
         return f"获取客户 {customer} 日期失败: {str(e)}"
 
+@mcp.tool()
+def clear_data_cache() -> str:
+    """清空数据缓存，强制下次分析时重新读取所有数据文件"""
+    try:
+        clear_data_caches()
+        return "✅ 已清空数据缓存，下次分析将重新读取数据文件"
+    except Exception as e:
+        return f"清空数据缓存失败: {str(e)}"
+
 @mcp.tool()
 def compare_payer_changes(
     customer: str = Field(description="客户名称 (如: customer1, customer2)"),
@@ -475,24 +660,22 @@ def compare_payer_changes(
     """比较指定客户两个日期之间Enterprise Payer账号和其下Linked账号的变化"""
     
     try:
-        # 加载两个日期的数据
-        accounts1 = load_enterprise_accounts_data(customer, date1)  # 使用Enterprise专用函数
-        accounts2 = load_enterprise_accounts_data(customer, date2)  # 使用Enterprise专用函数
-        
-        # 分析数据
-        analysis1 = analyze_enterprise_accounts(accounts1)
-        analysis2 = analyze_enterprise_accounts(accounts2)
+        # 两个日期的Enterprise分析结果与Linked账号变化共用同一份缓存
+        diff = _compute_linked_diff(customer, date1, date2)
+        analysis1 = diff["analysis1"]
+        analysis2 = diff["analysis2"]
         
         # 比较Payer账号变化
-        payers1 = {acc.account_id: acc for acc in analysis1["payer_accounts"]}
-        payers2 = {acc.account_id: acc for acc in analysis2["payer_accounts"]}
+        payers1 = analysis1["payers_by_id"]
+        payers2 = analysis2["payers_by_id"]
         
-        new_payers = set(payers2.keys()) - set(payers1.keys())
-        removed_payers = set(payers1.keys()) - set(payers2.keys())
-        common_payers = set(payers1.keys()) & set(payers2.keys())
+        # 新增/移除的Payer账号及其出现日期随Linked账号变化一起缓存，按数据文件中的顺序输出
+        new_payers = diff["new_payer_ids"]
+        removed_payers = diff["removed_payer_ids"]
+        common_payers = payers1.keys() & payers2.keys()
         
         # 生成报告
-        report = f"""# 🏢 {customer} Enterprise账号变化分析报告 ({date1} → {date2})
+        parts = [f"""# 🏢 {customer} Enterprise账号变化分析报告 ({date1} → {date2})
 
 ## 总体统计
 - {date1}: {analysis1['total_payers']} 个Payer账号, {analysis1['total_linked']} 个Linked账号
@@ -503,43 +686,43 @@ def compare_payer_changes(
 - 移除Payer账号: {len(removed_payers)} 个
 - 保持不变: {len(common_payers)} 个
 
-"""
+"""]
         
         if new_payers:
-            report += "### 🆕 新增的Payer账号:\n"
+            parts.append("### 🆕 新增的Payer账号:\n")
             for payer_id in new_payers:
                 payer = payers2[payer_id]
-                linked_count = len(analysis2["payer_to_linked"].get(payer_id, []))
-                first_seen = find_account_first_appearance(customer, payer_id, "PAYER")
+                linked_count = analysis2["linked_counts"].get(payer_id, 0)
+                first_seen = diff["payer_first_seen"][payer_id]
                 
-                report += f"- **{payer.account_name}** ({payer_id})\n"
-                report += f"  - 📅 首次出现日期: {first_seen or '未知'}\n"
-                report += f"  - 🔗 下属Linked账号: {linked_count} 个\n"
+                parts.append(f"- **{payer.account_name}** ({payer_id})\n")
+                parts.append(f"  - 📅 首次出现日期: {first_seen or '未知'}\n")
+                parts.append(f"  - 🔗 下属Linked账号: {linked_count} 个\n")
                 
                 if linked_count > 0:
-                    report += f"  - 📋 Linked账号列表:\n"
+                    parts.append(f"  - 📋 Linked账号列表:\n")
                     for linked in analysis2["payer_to_linked"][payer_id][:5]:  # 显示前5个
-                        report += f"    - {linked.account_name} ({linked.account_id})\n"
+                        parts.append(f"    - {linked.account_name} ({linked.account_id})\n")
                     if linked_count > 5:
-                        report += f"    - ... 还有 {linked_count - 5} 个账号\n"
-                report += "\n"
+                        parts.append(f"    - ... 还有 {linked_count - 5} 个账号\n")
+                parts.append("\n")
         
         if removed_payers:
-            report += "### ❌ 移除的Payer账号:\n"
+            parts.append("### ❌ 移除的Payer账号:\n")
             for payer_id in removed_payers:
                 payer = payers1[payer_id]
-                linked_count = len(analysis1["payer_to_linked"].get(payer_id, []))
-                last_seen = find_account_last_appearance(customer, payer_id, "PAYER")
+                linked_count = analysis1["linked_counts"].get(payer_id, 0)
+                last_seen = diff["payer_last_seen"][payer_id]
                 
-                report += f"- **{payer.account_name}** ({payer_id})\n"
-                report += f"  - 📅 最后出现日期: {last_seen or '未知'}\n"
-                report += f"  - 🔗 原有Linked账号: {linked_count} 个\n"
-                report += "\n"
-        
-        # 详细的Linked账号变化分析
-        linked_changes = analyze_linked_account_changes(customer, date1, date2)
-        if linked_changes and "error" not in linked_changes:
-            report += "## 🔗 Linked账号详细变化分析\n\n"
+                parts.append(f"- **{payer.account_name}** ({payer_id})\n")
+                parts.append(f"  - 📅 最后出现日期: {last_seen or '未知'}\n")
+                parts.append(f"  - 🔗 原有Linked账号: {linked_count} 个\n")
+                parts.append("\n")
+        
+        # 详细的Linked账号变化分析，直接使用上面已取得的变化结果
+        linked_changes = _merge_payer_changes(diff)
+        if linked_changes:
+            parts.append("## 🔗 Linked账号详细变化分析\n\n")
             
             has_changes = False
             for payer_id, changes in linked_changes.items():
@@ -547,143 +730,343 @@ def compare_payer_changes(
                     has_changes = True
                     payer_name = changes["new"][0]["payer_name"] if changes["new"] else changes["removed"][0]["payer_name"]
                     
-                    report += f"### 🏢 {payer_name} ({payer_id})\n"
+                    parts.append(f"### 🏢 {payer_name} ({payer_id})\n")
                     
                     if changes["new"]:
-                        report += f"**🆕 新增Linked账号 ({len(changes['new'])} 个):**\n"
-                        for item in changes["new"]:
-                            account = item["account"]
-                            first_seen = item["first_seen"]
-                            payer_info = f"挂在Payer: **{item['payer_name']}** ({item['payer_id']})"
-                            report += f"- **{account.account_name}** (ID: {account.account_id})\n"
-                            report += f"  - 🏢 {payer_info}\n"
-                            report += f"  - 📅 首次出现: {first_seen or '未知'}\n"
-                            report += f"  - 📊 状态: {account.status}\n"
-                            report += f"  - 🏷️  标签: {account.tags or '无'}\n"
+                        parts.append(f"**🆕 新增Linked账号 ({len(changes['new'])} 个):**\n")
+                        parts.extend(_format_linked_change(item, True) for item in changes["new"])
                     
                     if changes["removed"]:
-                        report += f"**❌ 移除Linked账号 ({len(changes['removed'])} 个):**\n"
-                        for item in changes["removed"]:
-                            account = item["account"]
-                            last_seen = item["last_seen"]
-                            payer_info = f"原挂在Payer: **{item['payer_name']}** ({item['payer_id']})"
-                            report += f"- **{account.account_name}** (ID: {account.account_id})\n"
-                            report += f"  - 🏢 {payer_info}\n"
-                            report += f"  - 📅 最后出现: {last_seen or '未知'}\n"
-                            report += f"  - 📊 状态: {account.status}\n"
-                            report += f"  - 🏷️  标签: {account.tags or '无'}\n"
+                        parts.append(f"**❌ 移除Linked账号 ({len(changes['removed'])} 个):**\n")
+                        parts.extend(_format_linked_change(item, False) for item in changes["removed"])
                     
-                    report += "\n"
+                    parts.append("\n")
             
             if not has_changes:
-                report += "✅ **无Linked账号变化**\n"
+                parts.append("✅ **无Linked账号变化**\n")
         else:
-            report += "## 🔗 Linked账号变化\n"
-            if "error" in linked_changes:
-                report += f"❌ 分析失败: {linked_changes['error']}\n"
-            else:
-                report += "✅ 无变化\n"
+            parts.append("## 🔗 Linked账号变化\n")
+            parts.append("✅ 无变化\n")
         
-        return report
+        return "".join(parts)
         
     except Exception as e:
         return f"分析客户 {customer} 失败: {str(e)}"
 
 # ============ 辅助函数 ============
 
-def find_account_first_appearance(customer: str, account_id: str, account_type: str = "PAYER") -> Optional[str]:
-    """查找指定客户账号首次出现的日期"""
-    dates = get_available_dates(customer)
-    
-    for date in dates:
+# find_account_*_appearance 的 account_type 参数到CSV中Account Type取值的映射
+ACCOUNT_TYPE_CODES = {"PAYER": "PAYER_ACCOUNT", "LINKED": "LINKED_ACCOUNT"}
+
+# Payer负载分档：Linked账号数量不超过各上限时归入对应档位，超过最后一个上限归入最后一档
+PAYER_LOAD_BOUNDS = (0, 2, 5, 10)
+PAYER_LOAD_LABELS = ("无Linked账号", "轻负载 (1-2个)", "中负载 (3-5个)", "重负载 (6-10个)", "超重负载 (10+个)")
+
+# Payer深度分析使用的负载分档：0个 / 1-3个 / 4-10个 / 11-20个 / 20+个Linked
+PAYER_LOAD_CATEGORY_BOUNDS = (0, 3, 10, 20)
+PAYER_LOAD_CATEGORIES = ("no_linked", "light_load", "medium_load", "heavy_load", "super_heavy")
+
+# 报告图表使用的预生成字符串：按得分/长度下标取用，不必每次拼接
+RATING_STARS = tuple("★" * i + "☆" * (5 - i) for i in range(6))
+SOLID_BARS = tuple("█" * i for i in range(21))
+SCORE_BARS = tuple("█" * i + "░" * (20 - i) for i in range(21))
+
+def _rating_stars(score: int) -> str:
+    """将得分转换为五星评级字符串"""
+    if 0 <= score <= 5:
+        return RATING_STARS[score]
+    # 超出0-5的得分（如负的管理得分）保持原有的拼接结果
+    return "★" * score + "☆" * (5 - score)
+
+def _split_tags(tags: str) -> List[str]:
+    """拆分账号标签字符串（分号或逗号分隔），去除空白并忽略空标签"""
+    # replace + split 均在C层完成，实测比正则切分和 translate 更快；每个标签只 strip 一次
+    return [tag for tag in map(str.strip, tags.replace(';', ',').split(',')) if tag]
+
+def _customer_data_files(customer: str) -> Tuple[Tuple[str, str, int, int], ...]:
+    """获取指定客户按日期排序的数据文件列表 (日期, 路径, 修改时间, 大小)"""
+    files = []
+    for date, filepath in sorted(_customer_file_index(customer).items()):
         try:
-            accounts = load_accounts_data(customer, date)
-            for account in accounts:
-                if account.account_id == account_id:
-                    if account_type == "PAYER" and account.is_payer():
-                        return date
-                    elif account_type == "LINKED" and account.is_linked():
-                        return date
-        except Exception:
+            file_stat = os.stat(filepath)
+        except OSError:
             continue
+        files.append((date, filepath, file_stat.st_mtime_ns, file_stat.st_size))
+    return tuple(files)
+
+def _account_appearance_index(customer: str) -> Dict[Tuple[str, str], List[str]]:
+    """获取指定客户的账号出现历史索引 {(账号ID, Account Type): [首次出现日期, 最后出现日期]}"""
+    # 所有数据文件的版本信息作为缓存键，任一文件变化后自动重建
+    return _build_appearance_index(customer, _customer_data_files(customer))
+
+@lru_cache(maxsize=32)
+def _build_appearance_index(customer: str, data_files: Tuple[Tuple[str, str, int, int], ...]) -> Dict[Tuple[str, str], List[str]]:
+    """按日期顺序扫描一遍所有数据文件，建立账号出现历史索引（优先读取磁盘上的持久化索引）"""
+    # 服务重启后内存缓存丢失，数据文件未变化时直接复用上次保存的索引
+    cache_path = _appearance_cache_path(customer)
+    fingerprint = _data_files_fingerprint(data_files)
+    if cache_path is not None:
+        index = _load_persisted_index(cache_path, fingerprint)
+        if index is not None:
+            return index
+    
+    index = {}
+    for date, account_keys in _scan_account_keys(data_files):
+        for key in account_keys:
+            seen = index.get(key)
+            if seen is None:
+                index[key] = [date, date]
+            else:
+                seen[1] = date
     
-    return None
+    if cache_path is not None:
+        _save_persisted_index(cache_path, fingerprint, index)
+    return index
+
+def _appearance_cache_path(customer: str) -> Optional[str]:
+    """获取客户账号历史索引的持久化文件路径，客户目录不在数据根目录下时返回None（不持久化）"""
+    root_dir = os.path.realpath(DATA_ROOT_DIR)
+    customer_dir = os.path.realpath(get_customer_data_dir(customer))
+    try:
+        if customer_dir == root_dir or os.path.commonpath([root_dir, customer_dir]) != root_dir:
+            return None
+    except ValueError:
+        return None
+    
+    # 文件名取自解析后客户目录的哈希，客户参数中的路径成分不会影响写入位置
+    digest = hashlib.sha256(customer_dir.encode('utf-8')).hexdigest()
+    return os.path.join(root_dir, '.cache', f'appearance_index-{digest}.json')
+
+def _data_files_fingerprint(data_files: Tuple[Tuple[str, str, int, int], ...]) -> str:
+    """根据所有数据文件的 (日期, 文件名, 修改时间, 大小) 计算指纹，用于校验持久化索引是否过期"""
+    digest = hashlib.sha256()
+    for date, filepath, mtime_ns, size in data_files:
+        digest.update(f"{date}\0{os.path.basename(filepath)}\0{mtime_ns}\0{size}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def _load_persisted_index(cache_path: str, fingerprint: str) -> Optional[Dict[Tuple[str, str], List[str]]]:
+    """读取持久化的账号出现历史索引，文件不存在、损坏或指纹不匹配时返回None"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get("fingerprint") != fingerprint:
+            return None
+        return {
+            (account_id, account_type): [first_date, last_date]
+            for account_id, account_type, first_date, last_date in data["accounts"]
+        }
+    except Exception:
+        return None
+
+def _save_persisted_index(cache_path: str, fingerprint: str, index: Dict[Tuple[str, str], List[str]]) -> None:
+    """保存账号出现历史索引到磁盘，写入失败（如数据目录只读）时忽略"""
+    data = {
+        "fingerprint": fingerprint,
+        "accounts": [[account_id, account_type, seen[0], seen[1]] for (account_id, account_type), seen in index.items()],
+    }
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False)
+        # 先写临时文件再替换，避免并发读取到写了一半的索引
+        os.replace(temp_path, cache_path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+def _scan_account_keys(data_files: Tuple[Tuple[str, str, int, int], ...]) -> List[Tuple[str, List[Tuple[str, str]]]]:
+    """获取每个日期的 (账号ID, Account Type) 列表，跳过解析失败的日期"""
+    results = []
+    for date, filepath, _, _ in data_files:
+        keys = _read_account_keys(filepath)
+        if keys is not None:
+            results.append((date, keys))
+    return results
+
+def _read_account_keys(filepath: str) -> Optional[List[Tuple[str, str]]]:
+    """读取单个数据文件中的 (账号ID, Account Type) 列表，解析失败返回None"""
+    try:
+        # 逐行流式读取两列，不构建账号记录也不写入解析缓存，扫描全部历史文件时内存占用不随文件数增长
+        with open(filepath, 'r', encoding='utf-8-sig', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return []
+            
+            positions = {name: index for index, name in enumerate(header)}
+            id_index = positions.get("Account ID")
+            type_index = positions.get("Account Type")
+            
+            intern = sys.intern
+            keys = []
+            for row in reader:
+                if not row:
+                    continue
+                width = len(row)
+                account_id = row[id_index].strip('"') if id_index is not None and id_index < width else ""
+                account_type = row[type_index].strip('"') if type_index is not None and type_index < width else ""
+                keys.append((intern(account_id), intern(account_type)))
+            return keys
+    except Exception:
+        return None
+
+def find_account_first_appearance(customer: str, account_id: str, account_type: str = "PAYER") -> Optional[str]:
+    """查找指定客户账号首次出现的日期"""
+    seen = _account_appearance_index(customer).get((account_id, ACCOUNT_TYPE_CODES.get(account_type)))
+    return seen[0] if seen else None
 
 def find_account_last_appearance(customer: str, account_id: str, account_type: str = "PAYER") -> Optional[str]:
     """查找指定客户账号最后出现的日期"""
-    dates = get_available_dates(customer)
-    
-    for date in reversed(dates):  # 从最新日期开始查找
-        try:
-            accounts = load_accounts_data(customer, date)
-            for account in accounts:
-                if account.account_id == account_id:
-                    if account_type == "PAYER" and account.is_payer():
-                        return date
-                    elif account_type == "LINKED" and account.is_linked():
-                        return date
-        except Exception:
-            continue
-    
-    return None
+    seen = _account_appearance_index(customer).get((account_id, ACCOUNT_TYPE_CODES.get(account_type)))
+    return seen[1] if seen else None
 
 def get_payer_name_by_id(customer: str, payer_id: str, date: str) -> str:
     """根据客户、Payer ID和日期获取Payer名称"""
     try:
-        accounts = load_accounts_data(customer, date)
-        for account in accounts:
-            if account.account_id == payer_id and account.is_payer():
-                return account.account_name
+        # 每个文件版本只建立一次索引，之后每次查找都是字典查询
+        payer_name = _payer_names_index(*_locate_accounts_file(customer, date)).get(payer_id)
+        if payer_name is not None:
+            return payer_name
     except Exception:
         pass
     return f"Unknown Payer ({payer_id})"
 
+def _compute_linked_diff(customer: str, date1: str, date2: str) -> Dict:
+    """计算指定客户两个日期之间Enterprise Linked账号的变化（结果会被缓存共享，调用方不应修改返回值）"""
+    # 两个日期的数据文件版本，以及首次/最后出现日期依赖的全部数据文件版本，共同作为缓存键
+    version_key = (
+        _locate_accounts_file(customer, date1),
+        _locate_accounts_file(customer, date2),
+        _customer_data_files(customer),
+    )
+    return _build_linked_diff(customer, date1, date2, version_key)
+
+@lru_cache(maxsize=32)
+def _build_linked_diff(customer: str, date1: str, date2: str, version_key: Tuple) -> Dict:
+    """加载两个日期的Enterprise数据并按Payer分组新增和移除的Linked账号"""
+    _, analysis1 = load_enterprise_analysis(customer, date1)
+    _, analysis2 = load_enterprise_analysis(customer, date2)
+    
+    # Linked账号映射随Enterprise分析结果一起缓存
+    linked1 = analysis1["linked_by_id"]
+    linked2 = analysis2["linked_by_id"]
+    
+    # 按数据文件中的顺序列出新增和移除的账号，报告结果可复现
+    new_linked_ids = [linked_id for linked_id in linked2 if linked_id not in linked1]
+    removed_linked_ids = [linked_id for linked_id in linked1 if linked_id not in linked2]
+    
+    # 历史索引只取一次，逐个账号直接查询
+    appearance = _account_appearance_index(customer)
+    linked_type = ACCOUNT_TYPE_CODES["LINKED"]
+    
+    # 按Payer分组新增的Linked账号
+    new_by_payer = defaultdict(list)
+    for linked_id in new_linked_ids:
+        linked_account = linked2[linked_id]
+        payer_id = linked_account.payer_id
+        seen = appearance.get((linked_id, linked_type))
+        
+        new_by_payer[payer_id].append({
+            "account": linked_account,
+            "payer_name": get_payer_name_by_id(customer, payer_id, date2),
+            "payer_id": payer_id,
+            "first_seen": seen[0] if seen else None
+        })
+    
+    # 按Payer分组移除的Linked账号
+    removed_by_payer = defaultdict(list)
+    for linked_id in removed_linked_ids:
+        linked_account = linked1[linked_id]
+        payer_id = linked_account.payer_id
+        seen = appearance.get((linked_id, linked_type))
+        
+        removed_by_payer[payer_id].append({
+            "account": linked_account,
+            "payer_name": get_payer_name_by_id(customer, payer_id, date1),
+            "payer_id": payer_id,
+            "last_seen": seen[1] if seen else None
+        })
+    
+    # 新增/移除的Payer账号及其首次/最后出现日期，与Linked账号共用同一份历史索引
+    payers1 = analysis1["payers_by_id"]
+    payers2 = analysis2["payers_by_id"]
+    payer_type = ACCOUNT_TYPE_CODES["PAYER"]
+    new_payer_ids = [payer_id for payer_id in payers2 if payer_id not in payers1]
+    removed_payer_ids = [payer_id for payer_id in payers1 if payer_id not in payers2]
+    payer_first_seen = {}
+    for payer_id in new_payer_ids:
+        seen = appearance.get((payer_id, payer_type))
+        payer_first_seen[payer_id] = seen[0] if seen else None
+    payer_last_seen = {}
+    for payer_id in removed_payer_ids:
+        seen = appearance.get((payer_id, payer_type))
+        payer_last_seen[payer_id] = seen[1] if seen else None
+    
+    return {
+        "analysis1": analysis1,
+        "analysis2": analysis2,
+        "linked1": linked1,
+        "linked2": linked2,
+        "new_linked_ids": new_linked_ids,
+        "removed_linked_ids": removed_linked_ids,
+        "new_by_payer": dict(new_by_payer),
+        "removed_by_payer": dict(removed_by_payer),
+        "new_payer_ids": new_payer_ids,
+        "removed_payer_ids": removed_payer_ids,
+        "payer_first_seen": payer_first_seen,
+        "payer_last_seen": payer_last_seen,
+    }
+
+def _merge_payer_changes(diff: Dict) -> Dict:
+    """按Payer合并Linked账号变化结果中新增和移除的Linked账号"""
+    payer_changes = defaultdict(lambda: {"new": [], "removed": []})
+    for payer_id, items in diff["new_by_payer"].items():
+        payer_changes[payer_id]["new"].extend(items)
+    for payer_id, items in diff["removed_by_payer"].items():
+        payer_changes[payer_id]["removed"].extend(items)
+    return dict(payer_changes)
+
+def _linked_change_labels(item: Dict, is_new: bool) -> Tuple[str, str, str]:
+    """返回新增/移除Linked账号条目的 (Payer说明, 日期标签, 日期)"""
+    payer_info = f"**{item['payer_name']}** ({item['payer_id']})"
+    if is_new:
+        return f"挂在Payer: {payer_info}", "首次出现", item["first_seen"] or "未知"
+    return f"原挂在Payer: {payer_info}", "最后出现", item["last_seen"] or "未知"
+
+def _format_linked_change(item: Dict, is_new: bool) -> str:
+    """格式化Payer变化报告中的单个新增/移除Linked账号条目"""
+    account = item["account"]
+    payer_info, seen_label, seen = _linked_change_labels(item, is_new)
+    return (
+        f"- **{account.account_name}** (ID: {account.account_id})\n"
+        f"  - 🏢 {payer_info}\n"
+        f"  - 📅 {seen_label}: {seen}\n"
+        f"  - 📊 状态: {account.status}\n"
+        f"  - 🏷️  标签: {account.tags or '无'}\n"
+    )
+
+def _format_linked_change_detail(index: int, item: Dict, is_new: bool) -> str:
+    """格式化Linked账号详细变化报告中的单个新增/移除账号条目"""
+    account = item["account"]
+    payer_info, seen_label, seen = _linked_change_labels(item, is_new)
+    return (
+        f"{index}. **{account.account_name}**\n"
+        f"   - 📋 账号ID: `{account.account_id}`\n"
+        f"   - 🏢 {payer_info}\n"
+        f"   - 📅 {seen_label}: {seen}\n"
+        f"   - 📊 状态: {account.status}\n"
+        f"   - 🏷️  标签: {account.tags or '无'}\n"
+        "\n"
+    )
+
 def analyze_linked_account_changes(customer: str, date1: str, date2: str) -> Dict:
     """详细分析指定客户Linked账号的变化情况"""
     try:
-        accounts1 = load_enterprise_accounts_data(customer, date1)  # 使用Enterprise专用函数
-        accounts2 = load_enterprise_accounts_data(customer, date2)  # 使用Enterprise专用函数
-        
-        analysis1 = analyze_enterprise_accounts(accounts1)
-        analysis2 = analyze_enterprise_accounts(accounts2)
-        
-        # 创建Linked账号映射
-        linked1 = {acc.account_id: acc for acc in analysis1["linked_accounts"]}
-        linked2 = {acc.account_id: acc for acc in analysis2["linked_accounts"]}
-        
-        new_linked_ids = set(linked2.keys()) - set(linked1.keys())
-        removed_linked_ids = set(linked1.keys()) - set(linked2.keys())
-        
-        # 按Payer分组分析变化
-        payer_changes = defaultdict(lambda: {"new": [], "removed": []})
-        
-        # 分析新增的Linked账号
-        for linked_id in new_linked_ids:
-            linked_account = linked2[linked_id]
-            payer_id = linked_account.payer_id
-            payer_name = get_payer_name_by_id(customer, payer_id, date2)
-            
-            payer_changes[payer_id]["new"].append({
-                "account": linked_account,
-                "payer_name": payer_name,
-                "payer_id": payer_id,
-                "first_seen": find_account_first_appearance(customer, linked_id, "LINKED")
-            })
-        
-        # 分析移除的Linked账号
-        for linked_id in removed_linked_ids:
-            linked_account = linked1[linked_id]
-            payer_id = linked_account.payer_id
-            payer_name = get_payer_name_by_id(customer, payer_id, date1)
-            
-            payer_changes[payer_id]["removed"].append({
-                "account": linked_account,
-                "payer_name": payer_name,
-                "payer_id": payer_id,
-                "last_seen": find_account_last_appearance(customer, linked_id, "LINKED")
-            })
-        
-        return dict(payer_changes)
+        # 按Payer合并新增和移除的Linked账号
+        return _merge_payer_changes(_compute_linked_diff(customer, date1, date2))
         
     except Exception as e:
         return {"error": str(e)}
@@ -697,131 +1080,69 @@ def get_detailed_linked_changes(
     """获取详细的Linked账号变化信息，包括具体账号名称、ID和所属Payer"""
     
     try:
-        # 加载两个日期的数据
-        accounts1 = load_enterprise_accounts_data(customer, date1)  # 使用Enterprise专用函数
-        accounts2 = load_enterprise_accounts_data(customer, date2)  # 使用Enterprise专用函数
-        
-        # 分析数据
-        analysis1 = analyze_enterprise_accounts(accounts1)
-        analysis2 = analyze_enterprise_accounts(accounts2)
-        
-        # 创建Linked账号映射
-        linked1 = {acc.account_id: acc for acc in analysis1["linked_accounts"]}
-        linked2 = {acc.account_id: acc for acc in analysis2["linked_accounts"]}
-        
-        new_linked_ids = set(linked2.keys()) - set(linked1.keys())
-        removed_linked_ids = set(linked1.keys()) - set(linked2.keys())
+        # 与 compare_payer_changes 共用缓存的Linked账号变化结果
+        diff = _compute_linked_diff(customer, date1, date2)
+        linked1 = diff["linked1"]
+        linked2 = diff["linked2"]
+        new_linked_ids = diff["new_linked_ids"]
+        removed_linked_ids = diff["removed_linked_ids"]
         
         # 生成详细报告
-        report = f"""# 🔗 {customer} Linked账号详细变化报告 ({date1} → {date2})
+        parts = [f"""# 🔗 {customer} Linked账号详细变化报告 ({date1} → {date2})
 
 ## 📊 变化概览
 - 🆕 新增Linked账号: {len(new_linked_ids)} 个
 - ❌ 移除Linked账号: {len(removed_linked_ids)} 个
 - 📈 净变化: {len(new_linked_ids) - len(removed_linked_ids):+d} 个
 
-"""
+"""]
         
         # 详细的新增Linked账号信息
         if new_linked_ids:
-            report += "## 🆕 新增Linked账号详细信息\n\n"
+            parts.append("## 🆕 新增Linked账号详细信息\n\n")
             
             # 按Payer分组显示
-            new_by_payer = defaultdict(list)
-            for linked_id in new_linked_ids:
-                linked_account = linked2[linked_id]
-                payer_id = linked_account.payer_id
-                payer_name = get_payer_name_by_id(customer, payer_id, date2)
-                first_seen = find_account_first_appearance(customer, linked_id, "LINKED")
-                
-                new_by_payer[payer_id].append({
-                    "account": linked_account,
-                    "payer_name": payer_name,
-                    "payer_id": payer_id,
-                    "first_seen": first_seen
-                })
-            
-            for payer_id, linked_list in new_by_payer.items():
+            for payer_id, linked_list in diff["new_by_payer"].items():
                 payer_name = linked_list[0]["payer_name"]
-                report += f"### 🏢 Payer: {payer_name} ({payer_id})\n"
-                report += f"**新增 {len(linked_list)} 个Linked账号:**\n\n"
+                parts.append(f"### 🏢 Payer: {payer_name} ({payer_id})\n")
+                parts.append(f"**新增 {len(linked_list)} 个Linked账号:**\n\n")
                 
-                for i, item in enumerate(linked_list, 1):
-                    account = item["account"]
-                    first_seen = item["first_seen"]
-                    payer_info = f"挂在Payer: **{item['payer_name']}** ({item['payer_id']})"
-                    report += f"{i}. **{account.account_name}**\n"
-                    report += f"   - 📋 账号ID: `{account.account_id}`\n"
-                    report += f"   - 🏢 {payer_info}\n"
-                    report += f"   - 📅 首次出现: {first_seen or '未知'}\n"
-                    report += f"   - 📊 状态: {account.status}\n"
-                    report += f"   - 🏷️  标签: {account.tags or '无'}\n"
-                    report += "\n"
+                parts.extend(_format_linked_change_detail(i, item, True) for i, item in enumerate(linked_list, 1))
                 
-                report += "\n"
+                parts.append("\n")
         
         # 详细的移除Linked账号信息
         if removed_linked_ids:
-            report += "## ❌ 移除Linked账号详细信息\n\n"
+            parts.append("## ❌ 移除Linked账号详细信息\n\n")
             
             # 按Payer分组显示
-            removed_by_payer = defaultdict(list)
-            for linked_id in removed_linked_ids:
-                linked_account = linked1[linked_id]
-                payer_id = linked_account.payer_id
-                payer_name = get_payer_name_by_id(customer, payer_id, date1)
-                last_seen = find_account_last_appearance(customer, linked_id, "LINKED")
-                
-                removed_by_payer[payer_id].append({
-                    "account": linked_account,
-                    "payer_name": payer_name,
-                    "payer_id": payer_id,
-                    "last_seen": last_seen
-                })
-            
-            for payer_id, linked_list in removed_by_payer.items():
+            for payer_id, linked_list in diff["removed_by_payer"].items():
                 payer_name = linked_list[0]["payer_name"]
-                report += f"### 🏢 Payer: {payer_name} ({payer_id})\n"
-                report += f"**移除 {len(linked_list)} 个Linked账号:**\n\n"
+                parts.append(f"### 🏢 Payer: {payer_name} ({payer_id})\n")
+                parts.append(f"**移除 {len(linked_list)} 个Linked账号:**\n\n")
                 
-                for i, item in enumerate(linked_list, 1):
-                    account = item["account"]
-                    last_seen = item["last_seen"]
-                    payer_info = f"原挂在Payer: **{item['payer_name']}** ({item['payer_id']})"
-                    report += f"{i}. **{account.account_name}**\n"
-                    report += f"   - 📋 账号ID: `{account.account_id}`\n"
-                    report += f"   - 🏢 {payer_info}\n"
-                    report += f"   - 📅 最后出现: {last_seen or '未知'}\n"
-                    report += f"   - 📊 状态: {account.status}\n"
-                    report += f"   - 🏷️  标签: {account.tags or '无'}\n"
-                    report += "\n"
+                parts.extend(_format_linked_change_detail(i, item, False) for i, item in enumerate(linked_list, 1))
                 
-                report += "\n"
+                parts.append("\n")
         
         # 如果没有变化
         if not new_linked_ids and not removed_linked_ids:
-            report += "## ✅ 无Linked账号变化\n\n"
-            report += "在指定的时间段内，没有发现任何Linked账号的新增或移除。\n"
+            parts.append("## ✅ 无Linked账号变化\n\n")
+            parts.append("在指定的时间段内，没有发现任何Linked账号的新增或移除。\n")
         
         # 汇总统计
-        report += "## 📈 汇总统计\n\n"
-        report += f"- **{date1}** Linked账号总数: {len(linked1)} 个\n"
-        report += f"- **{date2}** Linked账号总数: {len(linked2)} 个\n"
-        report += f"- **净变化**: {len(linked2) - len(linked1):+d} 个\n"
+        parts.append("## 📈 汇总统计\n\n")
+        parts.append(f"- **{date1}** Linked账号总数: {len(linked1)} 个\n")
+        parts.append(f"- **{date2}** Linked账号总数: {len(linked2)} 个\n")
+        parts.append(f"- **净变化**: {len(linked2) - len(linked1):+d} 个\n")
         
         if new_linked_ids or removed_linked_ids:
             # 按Payer统计变化
-            all_affected_payers = set()
-            if new_linked_ids:
-                for linked_id in new_linked_ids:
-                    all_affected_payers.add(linked2[linked_id].payer_id)
-            if removed_linked_ids:
-                for linked_id in removed_linked_ids:
-                    all_affected_payers.add(linked1[linked_id].payer_id)
+            all_affected_payers = set(diff["new_by_payer"]) | set(diff["removed_by_payer"])
             
-            report += f"- **受影响的Payer账号**: {len(all_affected_payers)} 个\n"
+            parts.append(f"- **受影响的Payer账号**: {len(all_affected_payers)} 个\n")
         
-        return report
+        return "".join(parts)
         
     except Exception as e:
         return f"获取详细Linked变化信息失败: {str(e)}"
@@ -836,176 +1157,183 @@ def analyze_single_date_accounts(
     
     try:
         # 加载指定日期的数据
-        accounts = load_enterprise_accounts_data(customer, date)  # 使用Enterprise专用函数
-        analysis = analyze_enterprise_accounts(accounts)
+        accounts, analysis = load_enterprise_analysis(customer, date)  # 使用缓存的Enterprise分析结果
+        if not accounts:
+            return f"❌ 客户 {customer} 在 {date} 没有Enterprise账号数据，无法生成分析报告"
+        if analysis['total_payers'] == 0:
+            return f"❌ 客户 {customer} 在 {date} 没有Enterprise Payer账号，无法生成Payer/Linked分析报告"
+        
+        # 账号总数和平均管理数在报告中多次使用，只计算一次
+        total_accounts = len(accounts)
+        avg_linked_per_payer = analysis['total_linked'] / analysis['total_payers'] if analysis['total_payers'] else 0
         
         # 生成详细的单日分析报告
-        report = f"""# 📊 {customer} 账号情况详细分析 ({date})
+        parts = [f"""# 📊 {customer} 账号情况详细分析 ({date})
 
 ## 🔢 整体统计概览
-- **总账号数**: {len(accounts)} 个
+- **总账号数**: {total_accounts} 个
 - **Payer账号**: {analysis['total_payers']} 个
 - **Linked账号**: {analysis['total_linked']} 个
-- **Payer/Linked比例**: 1:{analysis['total_linked']/analysis['total_payers']:.1f} (每个Payer平均管理{analysis['total_linked']/analysis['total_payers']:.1f}个Linked账号)
+- **Payer/Linked比例**: 1:{avg_linked_per_payer:.1f} (每个Payer平均管理{avg_linked_per_payer:.1f}个Linked账号)
 
 ## 🏢 Payer账号详细分析
 
 ### 📋 所有Payer账号列表
-"""
+"""]
         
         # 按Linked账号数量排序显示Payer账号
+        # 循环外预先绑定字典查询方法，避免每个Payer重复解析
+        get_linked = analysis['payer_to_linked'].get
         payer_with_counts = []
         for payer in analysis['payer_accounts']:
-            linked_accounts = analysis['payer_to_linked'].get(payer.account_id, [])
-            linked_count = len(linked_accounts)
-            payer_with_counts.append((payer, linked_count, linked_accounts))
+            linked_accounts = get_linked(payer.account_id, [])
+            payer_with_counts.append((payer, len(linked_accounts), linked_accounts))
         
         # 按Linked账号数量降序排序
-        payer_with_counts.sort(key=lambda x: x[1], reverse=True)
+        payer_with_counts.sort(key=itemgetter(1), reverse=True)
         
         for i, (payer, linked_count, linked_accounts) in enumerate(payer_with_counts, 1):
-            report += f"""
+            parts.append(f"""
 ### {i}. **{payer.account_name}** (ID: {payer.account_id})
 - 📊 状态: {payer.status}
 - 🔗 管理的Linked账号数: {linked_count} 个
 - 🏷️  标签: {payer.tags or '无'}
-"""
+""")
             
             if linked_count > 0:
-                report += f"- 📋 下属Linked账号详细列表:\n"
+                parts.append(f"- 📋 下属Linked账号详细列表:\n")
                 for j, linked in enumerate(linked_accounts, 1):
                     tags_info = f"标签: {linked.tags}" if linked.tags else "标签: 无"
-                    report += f"  {j}. **{linked.account_name}** (ID: {linked.account_id}) - 状态: {linked.status} - {tags_info}\n"
+                    parts.append(f"  {j}. **{linked.account_name}** (ID: {linked.account_id}) - 状态: {linked.status} - {tags_info}\n")
             else:
-                report += f"- 📋 下属Linked账号: 无\n"
+                parts.append(f"- 📋 下属Linked账号: 无\n")
         
         # 业务分析
-        report += f"""
+        parts.append(f"""
 
 ## 🏷️  业务标签分析
 
 ### 标签使用统计
-"""
+""")
         
         # 统计标签使用情况
-        tag_stats = {}
+        tag_stats = Counter()
         tagged_accounts = 0
         
         for account in accounts:
             if account.tags:
                 tagged_accounts += 1
                 # 分割标签（可能有多个标签用分号或逗号分隔）
-                tags = [tag.strip() for tag in account.tags.replace(';', ',').split(',') if tag.strip()]
-                for tag in tags:
-                    tag_stats[tag] = tag_stats.get(tag, 0) + 1
+                tag_stats.update(_split_tags(account.tags))
         
-        report += f"- 有标签的账号: {tagged_accounts} 个 ({tagged_accounts/len(accounts)*100:.1f}%)\n"
-        report += f"- 无标签的账号: {len(accounts) - tagged_accounts} 个 ({(len(accounts) - tagged_accounts)/len(accounts)*100:.1f}%)\n"
+        tagged_ratio = tagged_accounts/total_accounts
+        tagged_pct = tagged_ratio*100
+        parts.append(f"- 有标签的账号: {tagged_accounts} 个 ({tagged_pct:.1f}%)\n")
+        parts.append(f"- 无标签的账号: {total_accounts - tagged_accounts} 个 ({(total_accounts - tagged_accounts)/total_accounts*100:.1f}%)\n")
         
         if tag_stats:
-            report += f"\n### 标签分布 (前10个)\n"
-            sorted_tags = sorted(tag_stats.items(), key=lambda x: x[1], reverse=True)
-            for tag, count in sorted_tags[:10]:
-                report += f"- **{tag}**: {count} 个账号\n"
+            parts.append(f"\n### 标签分布 (前10个)\n")
+            parts.extend(f"- **{tag}**: {count} 个账号\n" for tag, count in tag_stats.most_common(10))
         
         # 账号状态分析
-        report += f"""
+        parts.append(f"""
 
 ## 📊 账号状态分析
 
 ### 状态分布
-"""
+""")
         
-        status_stats = {}
-        for account in accounts:
-            status = account.status or 'Unknown'
-            status_stats[status] = status_stats.get(status, 0) + 1
+        status_stats = Counter(account.status or 'Unknown' for account in accounts)
         
-        for status, count in sorted(status_stats.items(), key=lambda x: x[1], reverse=True):
-            percentage = count / len(accounts) * 100
-            report += f"- **{status}**: {count} 个账号 ({percentage:.1f}%)\n"
+        parts.extend(
+            f"- **{status}**: {count} 个账号 ({count / total_accounts * 100:.1f}%)\n"
+            for status, count in status_stats.most_common()
+        )
         
         # 管理效率分析
-        report += f"""
+        parts.append(f"""
 
 ## 📈 管理效率分析
 
 ### Payer账号管理负载分布
-"""
+""")
         
         # 按管理的Linked账号数量分组
-        load_distribution = {}
-        for _, linked_count, _ in payer_with_counts:
-            if linked_count == 0:
-                category = "无Linked账号"
-            elif linked_count <= 2:
-                category = "轻负载 (1-2个)"
-            elif linked_count <= 5:
-                category = "中负载 (3-5个)"
-            elif linked_count <= 10:
-                category = "重负载 (6-10个)"
-            else:
-                category = "超重负载 (10+个)"
-            
-            load_distribution[category] = load_distribution.get(category, 0) + 1
+        load_distribution = Counter(
+            PAYER_LOAD_LABELS[bisect_left(PAYER_LOAD_BOUNDS, linked_count)]
+            for _, linked_count, _ in payer_with_counts
+        )
         
-        for category, count in load_distribution.items():
-            percentage = count / len(payer_with_counts) * 100
-            report += f"- **{category}**: {count} 个Payer ({percentage:.1f}%)\n"
+        total_payers = len(payer_with_counts)
+        parts.extend(
+            f"- **{category}**: {count} 个Payer ({count / total_payers * 100:.1f}%)\n"
+            for category, count in load_distribution.items()
+        )
         
         # 建议和观察
-        report += f"""
+        parts.append(f"""
 
 ## 💡 关键观察和建议
 
 ### 📋 规模特征
-- 账号总规模: {len(accounts)} 个 ({'大型' if len(accounts) > 100 else '中型' if len(accounts) > 50 else '小型'}规模)
-- 管理结构: {'分散式' if analysis['total_payers'] > analysis['total_linked']/3 else '集中式'}管理 (Payer占比{analysis['total_payers']/len(accounts)*100:.1f}%)
+- 账号总规模: {total_accounts} 个 ({'大型' if total_accounts > 100 else '中型' if total_accounts > 50 else '小型'}规模)
+- 管理结构: {'分散式' if analysis['total_payers'] > analysis['total_linked']/3 else '集中式'}管理 (Payer占比{analysis['total_payers']/total_accounts*100:.1f}%)
 
 ### 🎯 管理建议
-"""
+""")
         
         # 根据数据特征生成建议
-        avg_linked_per_payer = analysis['total_linked'] / analysis['total_payers'] if analysis['total_payers'] > 0 else 0
-        
         if avg_linked_per_payer > 8:
-            report += f"- ⚠️  平均每个Payer管理{avg_linked_per_payer:.1f}个Linked账号，建议考虑增加Payer账号以降低管理复杂度\n"
+            parts.append(f"- ⚠️  平均每个Payer管理{avg_linked_per_payer:.1f}个Linked账号，建议考虑增加Payer账号以降低管理复杂度\n")
         elif avg_linked_per_payer < 2:
-            report += f"- 💡 平均每个Payer仅管理{avg_linked_per_payer:.1f}个Linked账号，可考虑整合部分Payer账号提高效率\n"
+            parts.append(f"- 💡 平均每个Payer仅管理{avg_linked_per_payer:.1f}个Linked账号，可考虑整合部分Payer账号提高效率\n")
         else:
-            report += f"- ✅ 平均每个Payer管理{avg_linked_per_payer:.1f}个Linked账号，管理负载较为合理\n"
+            parts.append(f"- ✅ 平均每个Payer管理{avg_linked_per_payer:.1f}个Linked账号，管理负载较为合理\n")
         
-        if tagged_accounts / len(accounts) < 0.5:
-            report += f"- 📝 仅{tagged_accounts/len(accounts)*100:.1f}%的账号有标签，建议完善账号标签以便更好地分类管理\n"
+        if tagged_ratio < 0.5:
+            parts.append(f"- 📝 仅{tagged_pct:.1f}%的账号有标签，建议完善账号标签以便更好地分类管理\n")
         else:
-            report += f"- ✅ {tagged_accounts/len(accounts)*100:.1f}%的账号已有标签，标签使用情况良好\n"
+            parts.append(f"- ✅ {tagged_pct:.1f}%的账号已有标签，标签使用情况良好\n")
         
         # 如果是单日数据，给出特别说明
-        available_dates = get_available_dates(customer)
-        if len(available_dates) == 1:
-            report += f"""
+        # 只需要日期数量，直接读取已缓存的文件索引，不再排序生成日期列表
+        if len(_customer_file_index(customer)) == 1:
+            parts.append(f"""
 ### 📅 数据说明
 - 当前仅有{date}一天的数据，无法进行趋势分析
 - 建议后续收集更多日期的数据以进行变化趋势分析
 - 可使用 `compare_payer_changes()` 和 `get_detailed_linked_changes()` 进行对比分析
-"""
+""")
         
-        return report
+        return "".join(parts)
         
     except Exception as e:
         return f"❌ 分析过程中发生错误: {str(e)}"
 
 # ============ 深度分析工具 ============
 
-def analyze_payer_distribution(accounts: List[AccountRecord]) -> Dict:
-    """深度分析Payer账号分布和特征"""
-    payer_accounts = [account for account in accounts if account.is_payer()]
-    linked_accounts = [account for account in accounts if account.is_linked()]
-    
-    # 按Payer分组Linked账号
+def _build_payer_index(accounts: List[AccountRecord]) -> Tuple[List[AccountRecord], List[AccountRecord], Dict[str, List[AccountRecord]]]:
+    """单次遍历拆分Payer/Linked账号，并按Payer分组Linked账号"""
+    payer_accounts = []
+    linked_accounts = []
     payer_to_linked = defaultdict(list)
-    for linked in linked_accounts:
-        payer_to_linked[linked.payer_id].append(linked)
+    
+    for account in accounts:
+        if account.is_payer():
+            payer_accounts.append(account)
+        elif account.is_linked():
+            linked_accounts.append(account)
+            payer_to_linked[account.payer_id].append(account)
+    
+    return payer_accounts, linked_accounts, dict(payer_to_linked)
+
+def analyze_payer_distribution(accounts: List[AccountRecord],
+                               payer_index: Optional[Tuple] = None) -> Dict:
+    """深度分析Payer账号分布和特征"""
+    # 调用方已有分组结果时直接复用，避免重复遍历账号列表
+    if payer_index is None:
+        payer_index = _build_payer_index(accounts)
+    payer_accounts, linked_accounts, payer_to_linked = payer_index
     
     # 分析每个Payer的详细信息
     payer_analysis = []
@@ -1013,30 +1341,26 @@ def analyze_payer_distribution(accounts: List[AccountRecord]) -> Dict:
         linked_list = payer_to_linked.get(payer.account_id, [])
         
         # 分析Linked账号的支持级别分布
-        support_level_dist = defaultdict(int)
-        for linked in linked_list:
-            support_level_dist[linked.support_level] += 1
+        support_level_dist = Counter(linked.support_level for linked in linked_list)
         
         # 分析标签分布
-        tag_analysis = defaultdict(int)
+        tag_analysis = Counter()
         for linked in linked_list:
             if linked.tags:
-                tags = [tag.strip() for tag in linked.tags.replace(';', ',').split(',') if tag.strip()]
-                for tag in tags:
-                    tag_analysis[tag] += 1
+                tag_analysis.update(_split_tags(linked.tags))
         
         payer_info = {
             'payer': payer,
             'linked_count': len(linked_list),
             'linked_accounts': linked_list,
-            'support_level_distribution': dict(support_level_dist),
-            'tag_distribution': dict(tag_analysis),
+            'support_level_distribution': support_level_dist,
+            'tag_distribution': tag_analysis,
             'avg_linked_per_support_level': len(linked_list) / max(1, len(support_level_dist))
         }
         payer_analysis.append(payer_info)
     
     # 按管理的账号数量排序
-    payer_analysis.sort(key=lambda x: x['linked_count'], reverse=True)
+    payer_analysis.sort(key=itemgetter('linked_count'), reverse=True)
     
     return {
         'payer_analysis': payer_analysis,
@@ -1048,59 +1372,66 @@ def analyze_payer_distribution(accounts: List[AccountRecord]) -> Dict:
 
 def _calculate_payer_load_distribution(payer_analysis: List[Dict]) -> Dict:
     """计算Payer负载分布"""
-    load_categories = {
-        'no_linked': 0,      # 0个Linked
-        'light_load': 0,     # 1-3个Linked
-        'medium_load': 0,    # 4-10个Linked
-        'heavy_load': 0,     # 11-20个Linked
-        'super_heavy': 0     # 20+个Linked
-    }
+    load_categories = dict.fromkeys(PAYER_LOAD_CATEGORIES, 0)
     
+    # 二分查找定位档位，代替逐档比较的 if/elif 链
     for payer_info in payer_analysis:
-        linked_count = payer_info['linked_count']
-        if linked_count == 0:
-            load_categories['no_linked'] += 1
-        elif linked_count <= 3:
-            load_categories['light_load'] += 1
-        elif linked_count <= 10:
-            load_categories['medium_load'] += 1
-        elif linked_count <= 20:
-            load_categories['heavy_load'] += 1
-        else:
-            load_categories['super_heavy'] += 1
+        bucket = bisect_left(PAYER_LOAD_CATEGORY_BOUNDS, payer_info['linked_count'])
+        load_categories[PAYER_LOAD_CATEGORIES[bucket]] += 1
     
     return load_categories
 
-def infer_industry_from_account_info(accounts: List[AccountRecord]) -> Dict:
+# 行业关键词映射
+INDUSTRY_KEYWORDS = {
+    'technology': ['tech', 'software', 'dev', 'api', 'cloud', 'data', 'ai', 'ml', 'analytics'],
+    'finance': ['bank', 'finance', 'payment', 'trading', 'fintech', 'credit', 'loan', 'insurance'],
+    'healthcare': ['health', 'medical', 'hospital', 'pharma', 'bio', 'clinic', 'patient'],
+    'retail': ['retail', 'shop', 'store', 'ecommerce', 'marketplace', 'commerce', 'sales'],
+    'media': ['media', 'content', 'streaming', 'video', 'audio', 'broadcast', 'news'],
+    'education': ['edu', 'school', 'university', 'learning', 'training', 'course'],
+    'gaming': ['game', 'gaming', 'entertainment', 'mobile', 'studio'],
+    'logistics': ['logistics', 'shipping', 'delivery', 'transport', 'supply'],
+    'manufacturing': ['manufacturing', 'factory', 'production', 'industrial'],
+    'government': ['gov', 'government', 'public', 'municipal', 'federal']
+}
+
+# 命名模式关键词，每类预编译为一个正则，一次扫描即可判断名称是否包含任一关键词
+NAMING_PATTERN_KEYWORDS = {
+    'environment_based': ['prod', 'production', 'dev', 'development', 'test', 'testing', 'staging', 'demo'],
+    'region_based': ['us', 'eu', 'asia', 'east', 'west', 'north', 'south', 'global', 'region'],
+    'function_based': ['api', 'web', 'db', 'database', 'analytics', 'data', 'ml', 'ai', 'backend', 'frontend'],
+    'team_based': ['team', 'dept', 'department', 'division', 'group', 'unit'],
+    'project_based': ['project', 'app', 'application', 'service', 'platform', 'system']
+}
+NAMING_PATTERN_RES = {
+    pattern: re.compile('|'.join(map(re.escape, keywords)))
+    for pattern, keywords in NAMING_PATTERN_KEYWORDS.items()
+}
+_DIGIT_RE = re.compile(r'\d')
+
+def infer_industry_from_account_info(accounts: List[AccountRecord],
+                                     lowered_names: Optional[List[str]] = None) -> Dict:
     """从账号信息推断行业特征"""
+    # 调用方已有小写账号名时直接复用，避免与命名模式分析重复转换
+    if lowered_names is None:
+        lowered_names = [account.account_name.lower() for account in accounts]
     
-    # 行业关键词映射
-    industry_keywords = {
-        'technology': ['tech', 'software', 'dev', 'api', 'cloud', 'data', 'ai', 'ml', 'analytics'],
-        'finance': ['bank', 'finance', 'payment', 'trading', 'fintech', 'credit', 'loan', 'insurance'],
-        'healthcare': ['health', 'medical', 'hospital', 'pharma', 'bio', 'clinic', 'patient'],
-        'retail': ['retail', 'shop', 'store', 'ecommerce', 'marketplace', 'commerce', 'sales'],
-        'media': ['media', 'content', 'streaming', 'video', 'audio', 'broadcast', 'news'],
-        'education': ['edu', 'school', 'university', 'learning', 'training', 'course'],
-        'gaming': ['game', 'gaming', 'entertainment', 'mobile', 'studio'],
-        'logistics': ['logistics', 'shipping', 'delivery', 'transport', 'supply'],
-        'manufacturing': ['manufacturing', 'factory', 'production', 'industrial'],
-        'government': ['gov', 'government', 'public', 'municipal', 'federal']
-    }
-    
-    industry_scores = defaultdict(int)
+    industry_scores = Counter()
     account_industry_mapping = {}
     
-    for account in accounts:
-        account_text = f"{account.account_name} {account.tags or ''}".lower()
+    for account, name_lower in zip(accounts, lowered_names):
+        account_text = f"{name_lower} {(account.tags or '').lower()}"
         account_industries = []
         
-        for industry, keywords in industry_keywords.items():
+        for industry, keywords in INDUSTRY_KEYWORDS.items():
+            # 同一行业的关键词连续检查，命中后只需追加一次行业，无需再查重
+            hits = 0
             for keyword in keywords:
                 if keyword in account_text:
-                    industry_scores[industry] += 1
-                    if industry not in account_industries:
-                        account_industries.append(industry)
+                    hits += 1
+            if hits:
+                industry_scores[industry] += hits
+                account_industries.append(industry)
         
         account_industry_mapping[account.account_id] = account_industries
     
@@ -1114,19 +1445,22 @@ def infer_industry_from_account_info(accounts: List[AccountRecord]) -> Dict:
         }
     
     # 确定主要行业
-    primary_industries = sorted(industry_distribution.items(), 
-                              key=lambda x: x[1]['score'], reverse=True)[:3]
+    primary_industries = heapq.nlargest(3, industry_distribution.items(),
+                                        key=lambda x: x[1]['score'])
     
     return {
         'industry_distribution': industry_distribution,
         'primary_industries': primary_industries,
         'account_industry_mapping': account_industry_mapping,
-        'industry_diversity_score': len([i for i in industry_scores.values() if i > 0]),
+        'industry_diversity_score': sum(1 for i in industry_scores.values() if i > 0),
         'total_industry_signals': sum(industry_scores.values())
     }
 
-def analyze_account_naming_patterns(accounts: List[AccountRecord]) -> Dict:
+def analyze_account_naming_patterns(accounts: List[AccountRecord],
+                                    lowered_names: Optional[List[str]] = None) -> Dict:
     """分析账号命名模式以获取更多业务洞察"""
+    if lowered_names is None:
+        lowered_names = [account.account_name.lower() for account in accounts]
     
     naming_patterns = {
         'environment_based': 0,  # prod, dev, test, staging
@@ -1138,49 +1472,27 @@ def analyze_account_naming_patterns(accounts: List[AccountRecord]) -> Dict:
         'hierarchical': 0        # 包含层级结构的账号
     }
     
-    environment_keywords = ['prod', 'production', 'dev', 'development', 'test', 'testing', 'staging', 'demo']
-    region_keywords = ['us', 'eu', 'asia', 'east', 'west', 'north', 'south', 'global', 'region']
-    function_keywords = ['api', 'web', 'db', 'database', 'analytics', 'data', 'ml', 'ai', 'backend', 'frontend']
-    team_keywords = ['team', 'dept', 'department', 'division', 'group', 'unit']
-    project_keywords = ['project', 'app', 'application', 'service', 'platform', 'system']
-    
+    # 每种模式最多保留的示例数量，计数超过后不再收集示例
+    max_examples = 5
     pattern_examples = defaultdict(list)
     
-    for account in accounts:
-        name_lower = account.account_name.lower()
+    for account, name_lower in zip(accounts, lowered_names):
+        # 检查各种关键词模式，每类只需一次正则扫描
+        for pattern, pattern_re in NAMING_PATTERN_RES.items():
+            if pattern_re.search(name_lower):
+                naming_patterns[pattern] += 1
+                if naming_patterns[pattern] <= max_examples:
+                    pattern_examples[pattern].append(account.account_name)
         
-        # 检查各种模式
-        if any(keyword in name_lower for keyword in environment_keywords):
-            naming_patterns['environment_based'] += 1
-            pattern_examples['environment_based'].append(account.account_name)
-        
-        if any(keyword in name_lower for keyword in region_keywords):
-            naming_patterns['region_based'] += 1
-            pattern_examples['region_based'].append(account.account_name)
-        
-        if any(keyword in name_lower for keyword in function_keywords):
-            naming_patterns['function_based'] += 1
-            pattern_examples['function_based'].append(account.account_name)
-        
-        if any(keyword in name_lower for keyword in team_keywords):
-            naming_patterns['team_based'] += 1
-            pattern_examples['team_based'].append(account.account_name)
-        
-        if any(keyword in name_lower for keyword in project_keywords):
-            naming_patterns['project_based'] += 1
-            pattern_examples['project_based'].append(account.account_name)
-        
-        if any(char.isdigit() for char in account.account_name):
+        if _DIGIT_RE.search(account.account_name):
             naming_patterns['numbered'] += 1
-            pattern_examples['numbered'].append(account.account_name)
+            if naming_patterns['numbered'] <= max_examples:
+                pattern_examples['numbered'].append(account.account_name)
         
         if '-' in account.account_name or '_' in account.account_name:
             naming_patterns['hierarchical'] += 1
-            pattern_examples['hierarchical'].append(account.account_name)
-    
-    # 限制示例数量
-    for pattern in pattern_examples:
-        pattern_examples[pattern] = pattern_examples[pattern][:5]
+            if naming_patterns['hierarchical'] <= max_examples:
+                pattern_examples['hierarchical'].append(account.account_name)
     
     return {
         'naming_patterns': naming_patterns,
@@ -1194,13 +1506,14 @@ def _calculate_naming_consistency(accounts: List[AccountRecord]) -> float:
     if len(accounts) < 2:
         return 1.0
     
-    # 分析命名长度的一致性
-    name_lengths = [len(account.account_name) for account in accounts]
-    avg_length = sum(name_lengths) / len(name_lengths)
-    length_variance = sum((length - avg_length) ** 2 for length in name_lengths) / len(name_lengths)
+    # 分析命名长度的一致性：长度为整数，总和与平方和在一次 map 中精确求得
+    n = len(accounts)
+    name_lengths = list(map(len, map(attrgetter("account_name"), accounts)))
+    total_length = sum(name_lengths)
+    total_squares = sum(map(mul, name_lengths, name_lengths))
     
     # 分析分隔符使用的一致性
-    separator_usage = defaultdict(int)
+    separator_usage = Counter()
     for account in accounts:
         if '-' in account.account_name:
             separator_usage['hyphen'] += 1
@@ -1210,7 +1523,8 @@ def _calculate_naming_consistency(accounts: List[AccountRecord]) -> float:
             separator_usage['space'] += 1
     
     # 计算一致性得分 (0-1之间)
-    length_consistency = max(0, 1 - (length_variance / (avg_length ** 2)))
+    # 方差/均值² = (n·Σx² - (Σx)²) / (Σx)²，分子为整数，长度全部相同时恰好为0
+    length_consistency = max(0, 1 - (n * total_squares - total_length ** 2) / (total_length ** 2))
     separator_consistency = max(separator_usage.values()) / len(accounts) if separator_usage else 0.5
     
     return (length_consistency + separator_consistency) / 2
@@ -1228,7 +1542,7 @@ def analyze_payer_detailed_distribution(
         payer_analysis = analyze_payer_distribution(accounts)
         
         # 生成详细的Payer分布分析报告
-        report = f"""# 🏢 {customer} Payer账号深度分析报告 ({date})
+        parts = [f"""# 🏢 {customer} Payer账号深度分析报告 ({date})
 
 ## 📊 Payer账号总体概览
 - **Payer账号总数**: {payer_analysis['total_payers']} 个
@@ -1236,7 +1550,7 @@ def analyze_payer_detailed_distribution(
 - **平均每个Payer管理**: {payer_analysis['avg_linked_per_payer']:.1f} 个Linked账号
 
 ## 📈 Payer负载分布分析
-"""
+"""]
         
         load_dist = payer_analysis['payer_load_distribution']
         total_payers = payer_analysis['total_payers']
@@ -1252,15 +1566,15 @@ def analyze_payer_detailed_distribution(
         for category, count, icon in load_categories:
             if count > 0:
                 percentage = (count / total_payers) * 100 if total_payers > 0 else 0
-                report += f"- {icon} **{category}**: {count} 个Payer ({percentage:.1f}%)\n"
+                parts.append(f"- {icon} **{category}**: {count} 个Payer ({percentage:.1f}%)\n")
         
         # 详细的Payer账号分析
-        report += f"""
+        parts.append(f"""
 
 ## 🔍 Top 10 Payer账号详细分析
 
 ### 按管理的Linked账号数量排序
-"""
+""")
         
         for i, payer_info in enumerate(payer_analysis['payer_analysis'][:10], 1):
             payer = payer_info['payer']
@@ -1268,85 +1582,84 @@ def analyze_payer_detailed_distribution(
             support_dist = payer_info['support_level_distribution']
             tag_dist = payer_info['tag_distribution']
             
-            report += f"""
+            parts.append(f"""
 ### {i}. **{payer.account_name}** (ID: {payer.account_id})
 - 📊 **管理规模**: {linked_count} 个Linked账号
 - 🏷️  **Payer标签**: {payer.tags or '无'}
 - 📈 **状态**: {payer.status}
 
 #### 下属账号支持级别分布:
-"""
+""")
             
             if support_dist:
-                for level, count in sorted(support_dist.items(), key=lambda x: x[1], reverse=True):
+                for level, count in support_dist.most_common():
                     level_icon = {"ENTERPRISE": "🏆", "BUSINESS": "💼", "DEVELOPER": "👨‍💻", "BASIC": "📱"}.get(level, "❓")
                     percentage = (count / linked_count) * 100 if linked_count > 0 else 0
-                    report += f"- {level_icon} **{level}**: {count} 个 ({percentage:.1f}%)\n"
+                    parts.append(f"- {level_icon} **{level}**: {count} 个 ({percentage:.1f}%)\n")
             else:
-                report += "- 无Linked账号\n"
+                parts.append("- 无Linked账号\n")
             
             if tag_dist:
-                report += f"\n#### 下属账号业务标签分布:\n"
-                for tag, count in sorted(tag_dist.items(), key=lambda x: x[1], reverse=True)[:5]:
+                parts.append(f"\n#### 下属账号业务标签分布:\n")
+                for tag, count in tag_dist.most_common(5):
                     percentage = (count / linked_count) * 100 if linked_count > 0 else 0
-                    report += f"- 🏷️ **{tag}**: {count} 个账号 ({percentage:.1f}%)\n"
+                    parts.append(f"- 🏷️ **{tag}**: {count} 个账号 ({percentage:.1f}%)\n")
         
         # 管理效率分析
-        report += f"""
+        parts.append(f"""
 
 ## 📊 管理效率分析
 
 ### 负载均衡评估
-"""
+""")
         
         if load_dist['super_heavy'] > 0:
-            report += f"- ⚠️ **管理过载风险**: {load_dist['super_heavy']} 个Payer管理超过20个Linked账号，建议考虑分拆\n"
+            parts.append(f"- ⚠️ **管理过载风险**: {load_dist['super_heavy']} 个Payer管理超过20个Linked账号，建议考虑分拆\n")
         
         if load_dist['no_linked'] > total_payers * 0.2:
-            report += f"- 💡 **资源优化机会**: {load_dist['no_linked']} 个Payer无Linked账号，可考虑整合或重新分配\n"
+            parts.append(f"- 💡 **资源优化机会**: {load_dist['no_linked']} 个Payer无Linked账号，可考虑整合或重新分配\n")
         
         optimal_payers = load_dist['light_load'] + load_dist['medium_load']
         if optimal_payers > total_payers * 0.6:
-            report += f"- ✅ **管理结构良好**: {optimal_payers} 个Payer ({(optimal_payers/total_payers)*100:.1f}%) 处于最佳管理负载范围\n"
+            parts.append(f"- ✅ **管理结构良好**: {optimal_payers} 个Payer ({(optimal_payers/total_payers)*100:.1f}%) 处于最佳管理负载范围\n")
         
         # 业务集中度分析
-        report += f"""
+        parts.append(f"""
 
 ### 业务集中度分析
-"""
+""")
         
         # 计算基尼系数来衡量Linked账号分布的不均匀程度
         linked_counts = [info['linked_count'] for info in payer_analysis['payer_analysis']]
         if linked_counts:
             gini_coefficient = _calculate_gini_coefficient(linked_counts)
             if gini_coefficient > 0.7:
-                report += f"- 📊 **高度集中**: 基尼系数 {gini_coefficient:.2f}，少数Payer管理大部分Linked账号\n"
+                parts.append(f"- 📊 **高度集中**: 基尼系数 {gini_coefficient:.2f}，少数Payer管理大部分Linked账号\n")
             elif gini_coefficient > 0.4:
-                report += f"- 📊 **中度集中**: 基尼系数 {gini_coefficient:.2f}，管理负载分布不均\n"
+                parts.append(f"- 📊 **中度集中**: 基尼系数 {gini_coefficient:.2f}，管理负载分布不均\n")
             else:
-                report += f"- 📊 **分布均匀**: 基尼系数 {gini_coefficient:.2f}，管理负载分布相对均匀\n"
+                parts.append(f"- 📊 **分布均匀**: 基尼系数 {gini_coefficient:.2f}，管理负载分布相对均匀\n")
         
-        return report
+        return "".join(parts)
         
     except Exception as e:
         return f"分析客户 {customer} Payer分布失败: {str(e)}"
 
 def _calculate_gini_coefficient(values: List[int]) -> float:
     """计算基尼系数"""
-    if not values or all(v == 0 for v in values):
+    if not values:
         return 0.0
     
     sorted_values = sorted(values)
     n = len(sorted_values)
     cumsum = sum(sorted_values)
     
+    # 全为0时总和为0，无需再单独扫描一遍
     if cumsum == 0:
         return 0.0
     
-    # 计算基尼系数
-    gini = 0
-    for i, value in enumerate(sorted_values):
-        gini += (2 * (i + 1) - n - 1) * value
+    # 计算基尼系数: Σ(2i-n-1)·xᵢ = 2·Σi·xᵢ - (n+1)·Σxᵢ，加权和由 map(mul) 在C层完成
+    gini = 2 * sum(map(mul, range(1, n + 1), sorted_values)) - (n + 1) * cumsum
     
     return gini / (n * cumsum)
 
@@ -1360,24 +1673,26 @@ def analyze_industry_insights(
     try:
         # 加载指定日期的所有账号数据
         accounts = load_accounts_data(customer, date)
-        industry_analysis = infer_industry_from_account_info(accounts)
-        naming_analysis = analyze_account_naming_patterns(accounts)
+        # 两项分析共用同一份小写账号名
+        lowered_names = [account.account_name.lower() for account in accounts]
+        industry_analysis = infer_industry_from_account_info(accounts, lowered_names)
+        naming_analysis = analyze_account_naming_patterns(accounts, lowered_names)
         
         # 生成行业洞察分析报告
-        report = f"""# 🏭 {customer} 行业特征与业务模式分析 ({date})
+        parts = [f"""# 🏭 {customer} 行业特征与业务模式分析 ({date})
 
 ## 🎯 行业特征识别
 
 ### 主要行业分布
-"""
+"""]
         
         industry_dist = industry_analysis['industry_distribution']
         if industry_dist:
-            # 按得分排序显示行业分布
-            sorted_industries = sorted(industry_dist.items(), 
-                                     key=lambda x: x[1]['score'], reverse=True)
+            # 按得分取前5个行业显示，无需对全部行业排序
+            sorted_industries = heapq.nlargest(5, industry_dist.items(),
+                                               key=lambda x: x[1]['score'])
             
-            for industry, data in sorted_industries[:5]:  # 显示前5个行业
+            for industry, data in sorted_industries:  # 显示前5个行业
                 if data['score'] > 0:
                     industry_icons = {
                         'technology': '💻',
@@ -1392,39 +1707,39 @@ def analyze_industry_insights(
                         'government': '🏛️'
                     }
                     icon = industry_icons.get(industry, '🏢')
-                    report += f"- {icon} **{industry.title()}**: {data['score']} 个信号 ({data['percentage']:.1f}%)\n"
+                    parts.append(f"- {icon} **{industry.title()}**: {data['score']} 个信号 ({data['percentage']:.1f}%)\n")
         else:
-            report += "- ❓ 无法从账号信息中识别明确的行业特征\n"
+            parts.append("- ❓ 无法从账号信息中识别明确的行业特征\n")
         
         # 行业多样性分析
         diversity_score = industry_analysis['industry_diversity_score']
         total_signals = industry_analysis['total_industry_signals']
         
-        report += f"""
+        parts.append(f"""
 
 ### 行业多样性评估
 - **行业多样性得分**: {diversity_score} 个不同行业
 - **总行业信号数**: {total_signals} 个
 - **平均每账号信号**: {total_signals / len(accounts):.2f} 个
 
-"""
+""")
         
         if diversity_score >= 5:
-            report += "- 🌈 **高度多元化**: 业务涵盖多个行业领域，具有良好的风险分散\n"
+            parts.append("- 🌈 **高度多元化**: 业务涵盖多个行业领域，具有良好的风险分散\n")
         elif diversity_score >= 3:
-            report += "- 🔄 **中度多元化**: 业务涉及几个主要行业，有一定的多样性\n"
+            parts.append("- 🔄 **中度多元化**: 业务涉及几个主要行业，有一定的多样性\n")
         elif diversity_score >= 1:
-            report += "- 🎯 **专业化聚焦**: 业务主要集中在特定行业领域\n"
+            parts.append("- 🎯 **专业化聚焦**: 业务主要集中在特定行业领域\n")
         else:
-            report += "- ❓ **行业特征不明**: 无法从现有信息识别明确的行业定位\n"
+            parts.append("- ❓ **行业特征不明**: 无法从现有信息识别明确的行业定位\n")
         
         # 命名模式分析
-        report += f"""
+        parts.append(f"""
 
 ## 📝 账号命名模式分析
 
 ### 命名规律识别
-"""
+""")
         
         naming_patterns = naming_analysis['naming_patterns']
         total_accounts = naming_analysis['total_accounts']
@@ -1443,52 +1758,52 @@ def analyze_industry_insights(
             count = naming_patterns.get(pattern_key, 0)
             if count > 0:
                 percentage = (count / total_accounts) * 100
-                report += f"- {icon} **{pattern_name}**: {count} 个账号 ({percentage:.1f}%) - {description}\n"
+                parts.append(f"- {icon} **{pattern_name}**: {count} 个账号 ({percentage:.1f}%) - {description}\n")
         
         # 命名一致性分析
         consistency_score = naming_analysis['naming_consistency_score']
-        report += f"""
+        parts.append(f"""
 
 ### 命名规范化程度
 - **一致性得分**: {consistency_score:.2f} (0-1之间，越高越一致)
 
-"""
+""")
         
         if consistency_score >= 0.8:
-            report += "- ✅ **高度规范化**: 账号命名非常一致，管理规范良好\n"
+            parts.append("- ✅ **高度规范化**: 账号命名非常一致，管理规范良好\n")
         elif consistency_score >= 0.6:
-            report += "- 💼 **中度规范化**: 账号命名较为一致，有一定的管理规范\n"
+            parts.append("- 💼 **中度规范化**: 账号命名较为一致，有一定的管理规范\n")
         elif consistency_score >= 0.4:
-            report += "- 📱 **初步规范化**: 账号命名有一定规律，但仍有改进空间\n"
+            parts.append("- 📱 **初步规范化**: 账号命名有一定规律，但仍有改进空间\n")
         else:
-            report += "- ⚠️ **规范化不足**: 账号命名缺乏一致性，建议建立命名规范\n"
+            parts.append("- ⚠️ **规范化不足**: 账号命名缺乏一致性，建议建立命名规范\n")
         
         # 业务模式推断
-        report += f"""
+        parts.append(f"""
 
 ## 🔍 业务模式推断
 
 ### 组织架构特征
-"""
+""")
         
         # 基于命名模式推断组织架构
         if naming_patterns.get('team_based', 0) > total_accounts * 0.3:
-            report += "- 👥 **团队导向型组织**: 账号按团队划分，可能采用敏捷或DevOps模式\n"
+            parts.append("- 👥 **团队导向型组织**: 账号按团队划分，可能采用敏捷或DevOps模式\n")
         
         if naming_patterns.get('environment_based', 0) > total_accounts * 0.4:
-            report += "- 🌍 **环境分离型**: 严格的开发/测试/生产环境分离，规范的软件开发流程\n"
+            parts.append("- 🌍 **环境分离型**: 严格的开发/测试/生产环境分离，规范的软件开发流程\n")
         
         if naming_patterns.get('region_based', 0) > total_accounts * 0.3:
-            report += "- 🗺️ **全球化运营**: 按地理区域部署，可能是跨国或多地区业务\n"
+            parts.append("- 🗺️ **全球化运营**: 按地理区域部署，可能是跨国或多地区业务\n")
         
         if naming_patterns.get('function_based', 0) > total_accounts * 0.4:
-            report += "- ⚙️ **微服务架构**: 按功能模块划分账号，可能采用微服务或SOA架构\n"
+            parts.append("- ⚙️ **微服务架构**: 按功能模块划分账号，可能采用微服务或SOA架构\n")
         
         # 技术成熟度评估
-        report += f"""
+        parts.append(f"""
 
 ### 技术成熟度评估
-"""
+""")
         
         tech_indicators = 0
         if 'technology' in [item[0] for item in industry_analysis['primary_industries'][:3]]:
@@ -1501,32 +1816,52 @@ def analyze_industry_insights(
             tech_indicators += 1
         
         if tech_indicators >= 4:
-            report += "- 🚀 **高技术成熟度**: 具备先进的技术架构和管理实践\n"
+            parts.append("- 🚀 **高技术成熟度**: 具备先进的技术架构和管理实践\n")
         elif tech_indicators >= 2:
-            report += "- 💼 **中等技术成熟度**: 有一定的技术基础和规范\n"
+            parts.append("- 💼 **中等技术成熟度**: 有一定的技术基础和规范\n")
         else:
-            report += "- 📱 **基础技术水平**: 技术架构相对简单，有提升空间\n"
+            parts.append("- 📱 **基础技术水平**: 技术架构相对简单，有提升空间\n")
         
         # 示例展示
         if naming_analysis['pattern_examples']:
-            report += f"""
+            parts.append(f"""
 
 ## 📋 命名模式示例
 
-"""
+""")
             for pattern, examples in naming_analysis['pattern_examples'].items():
                 if examples:
                     pattern_name = next((desc[1] for desc in pattern_descriptions if desc[0] == pattern), pattern)
-                    report += f"### {pattern_name}示例:\n"
+                    parts.append(f"### {pattern_name}示例:\n")
                     for example in examples[:3]:  # 只显示前3个示例
-                        report += f"- `{example}`\n"
-                    report += "\n"
+                        parts.append(f"- `{example}`\n")
+                    parts.append("\n")
         
-        return report
+        return "".join(parts)
         
     except Exception as e:
         return f"分析客户 {customer} 行业特征失败: {str(e)}"
 
+def _run_all_analyses(accounts: List[AccountRecord], overall_analysis: Optional[Dict] = None) -> Dict:
+    """执行综合洞察所需的全部分析，各分析之间共享中间结果"""
+    if overall_analysis is None:
+        overall_analysis = analyze_all_accounts(accounts)
+    # 复用整体分析中的账号分组，Payer分析不再单独遍历一次账号
+    payer_analysis = analyze_payer_distribution(accounts, (
+        overall_analysis['payer_accounts'],
+        overall_analysis['linked_accounts'],
+        overall_analysis['payer_to_linked'],
+    ))
+    # 行业推断和命名模式分析共用同一份小写账号名
+    lowered_names = [account.account_name.lower() for account in accounts]
+    
+    return {
+        'overall': overall_analysis,
+        'payer': payer_analysis,
+        'industry': infer_industry_from_account_info(accounts, lowered_names),
+        'naming': analyze_account_naming_patterns(accounts, lowered_names),
+    }
+
 # ============ 新增Overall分析工具 ============
 
 @mcp.tool()
@@ -1538,16 +1873,16 @@ def analyze_comprehensive_business_insights(
     
     try:
         # 加载指定日期的所有账号数据
-        accounts = load_accounts_data(customer, date)
+        accounts, overall_analysis = load_all_accounts_analysis(customer, date)
         
-        # 执行多维度分析
-        overall_analysis = analyze_all_accounts(accounts)
-        payer_analysis = analyze_payer_distribution(accounts)
-        industry_analysis = infer_industry_from_account_info(accounts)
-        naming_analysis = analyze_account_naming_patterns(accounts)
+        # 执行多维度分析，整体分析直接使用缓存结果
+        analyses = _run_all_analyses(accounts, overall_analysis)
+        payer_analysis = analyses['payer']
+        industry_analysis = analyses['industry']
+        naming_analysis = analyses['naming']
         
         # 生成综合业务洞察报告
-        report = f"""# 🎯 {customer} 综合业务洞察分析报告 ({date})
+        parts = [f"""# 🎯 {customer} 综合业务洞察分析报告 ({date})
 
 ## 📊 执行摘要
 
@@ -1559,7 +1894,7 @@ def analyze_comprehensive_business_insights(
 - **命名规范化**: {naming_analysis['naming_consistency_score']:.1%} 一致性得分
 
 ### 🎯 关键发现
-"""
+"""]
         
         # 生成关键发现
         key_findings = []
@@ -1598,33 +1933,32 @@ def analyze_comprehensive_business_insights(
         if naming_analysis['naming_consistency_score'] > 0.7:
             key_findings.append("🚀 **高技术成熟度**: 命名规范化程度高，管理体系成熟")
         
-        for finding in key_findings:
-            report += f"- {finding}\n"
+        parts.extend(f"- {finding}\n" for finding in key_findings)
         
         # 详细分析部分
-        report += f"""
+        parts.append(f"""
 
 ## 🏢 组织架构深度分析
 
 ### Payer账号管理分布
-"""
+""")
         
         load_dist = payer_analysis['payer_load_distribution']
         total_payers = payer_analysis['total_payers']
         
         # 管理负载可视化
-        report += f"```\n"
-        report += f"Payer负载分布:\n"
-        report += f"无Linked    │{'█' * (load_dist['no_linked'] * 20 // max(1, total_payers))}│ {load_dist['no_linked']} 个\n"
-        report += f"轻负载(1-3) │{'█' * (load_dist['light_load'] * 20 // max(1, total_payers))}│ {load_dist['light_load']} 个\n"
-        report += f"中负载(4-10)│{'█' * (load_dist['medium_load'] * 20 // max(1, total_payers))}│ {load_dist['medium_load']} 个\n"
-        report += f"重负载(11+) │{'█' * ((load_dist['heavy_load'] + load_dist['super_heavy']) * 20 // max(1, total_payers))}│ {load_dist['heavy_load'] + load_dist['super_heavy']} 个\n"
-        report += f"```\n"
+        parts.append(f"```\n")
+        parts.append(f"Payer负载分布:\n")
+        parts.append(f"无Linked    │{SOLID_BARS[load_dist['no_linked'] * 20 // max(1, total_payers)]}│ {load_dist['no_linked']} 个\n")
+        parts.append(f"轻负载(1-3) │{SOLID_BARS[load_dist['light_load'] * 20 // max(1, total_payers)]}│ {load_dist['light_load']} 个\n")
+        parts.append(f"中负载(4-10)│{SOLID_BARS[load_dist['medium_load'] * 20 // max(1, total_payers)]}│ {load_dist['medium_load']} 个\n")
+        parts.append(f"重负载(11+) │{SOLID_BARS[(load_dist['heavy_load'] + load_dist['super_heavy']) * 20 // max(1, total_payers)]}│ {load_dist['heavy_load'] + load_dist['super_heavy']} 个\n")
+        parts.append(f"```\n")
         
         # Top 5 Payer账号
-        report += f"""
+        parts.append(f"""
 ### 🏆 Top 5 Payer账号 (按管理规模)
-"""
+""")
         
         for i, payer_info in enumerate(payer_analysis['payer_analysis'][:5], 1):
             payer = payer_info['payer']
@@ -1632,39 +1966,37 @@ def analyze_comprehensive_business_insights(
             support_dist = payer_info['support_level_distribution']
             
             # 计算主要支持级别
-            main_support_level = "Mixed"
-            if support_dist:
-                main_support_level = max(support_dist.items(), key=lambda x: x[1])[0]
+            main_support_level = max(support_dist, key=support_dist.get) if support_dist else "Mixed"
             
-            report += f"{i}. **{payer.account_name}** - {linked_count} 个Linked账号 (主要: {main_support_level})\n"
+            parts.append(f"{i}. **{payer.account_name}** - {linked_count} 个Linked账号 (主要: {main_support_level})\n")
         
         # 行业与业务模式分析
-        report += f"""
+        parts.append(f"""
 
 ## 🏭 行业特征与业务模式
 
 ### 行业分布热力图
-"""
+""")
         
         if industry_analysis['industry_distribution']:
-            sorted_industries = sorted(industry_analysis['industry_distribution'].items(), 
-                                     key=lambda x: x[1]['score'], reverse=True)[:5]
+            sorted_industries = heapq.nlargest(5, industry_analysis['industry_distribution'].items(),
+                                               key=lambda x: x[1]['score'])
             
             max_score = max(item[1]['score'] for item in sorted_industries) if sorted_industries else 1
             
-            report += f"```\n"
+            parts.append(f"```\n")
             for industry, data in sorted_industries:
                 if data['score'] > 0:
                     bar_length = int((data['score'] / max_score) * 20)
-                    bar = '█' * bar_length + '░' * (20 - bar_length)
-                    report += f"{industry:12} │{bar}│ {data['score']} 信号 ({data['percentage']:.1f}%)\n"
-            report += f"```\n"
+                    bar = SCORE_BARS[bar_length]
+                    parts.append(f"{industry:12} │{bar}│ {data['score']} 信号 ({data['percentage']:.1f}%)\n")
+            parts.append(f"```\n")
         
         # 命名模式分析
-        report += f"""
+        parts.append(f"""
 
 ### 命名模式特征分析
-"""
+""")
         
         naming_patterns = naming_analysis['naming_patterns']
         total_accounts = naming_analysis['total_accounts']
@@ -1680,18 +2012,17 @@ def analyze_comprehensive_business_insights(
             pattern_insights.append("👥 **团队协作型**: 基于团队的组织架构")
         
         if pattern_insights:
-            for insight in pattern_insights:
-                report += f"- {insight}\n"
+            parts.extend(f"- {insight}\n" for insight in pattern_insights)
         else:
-            report += "- 📝 **自由命名模式**: 未发现明显的命名规律，可能需要建立命名规范\n"
+            parts.append("- 📝 **自由命名模式**: 未发现明显的命名规律，可能需要建立命名规范\n")
         
         # 业务成熟度评估
-        report += f"""
+        parts.append(f"""
 
 ## 📈 业务成熟度综合评估
 
 ### 成熟度维度评分
-"""
+""")
         
         # 计算各维度成熟度得分
         scale_score = min(5, (overall_analysis['total_accounts'] // 20) + 1)  # 规模得分
@@ -1710,12 +2041,12 @@ def analyze_comprehensive_business_insights(
         
         total_score = 0
         for dimension, score, description in dimensions:
-            stars = "★" * score + "☆" * (5 - score)
-            report += f"- **{dimension}**: {stars} ({score}/5) - {description}\n"
+            stars = _rating_stars(score)
+            parts.append(f"- **{dimension}**: {stars} ({score}/5) - {description}\n")
             total_score += score
         
         avg_score = total_score / len(dimensions)
-        report += f"\n**综合成熟度得分**: {avg_score:.1f}/5.0\n"
+        parts.append(f"\n**综合成熟度得分**: {avg_score:.1f}/5.0\n")
         
         if avg_score >= 4.0:
             maturity_level = "🏆 **高度成熟**: 具备企业级管理水平和技术架构"
@@ -1726,15 +2057,15 @@ def analyze_comprehensive_business_insights(
         else:
             maturity_level = "🌱 **初期阶段**: 业务快速发展，管理体系需要建立"
         
-        report += f"\n{maturity_level}\n"
+        parts.append(f"\n{maturity_level}\n")
         
         # 战略建议
-        report += f"""
+        parts.append(f"""
 
 ## 💡 战略建议与行动计划
 
 ### 🎯 优先改进领域
-"""
+""")
         
         recommendations = []
         
@@ -1757,11 +2088,10 @@ def analyze_comprehensive_business_insights(
         if not recommendations:
             recommendations.append("✅ **持续优化**: 当前业务结构良好，建议保持现有策略并持续监控")
         
-        for rec in recommendations:
-            report += f"- {rec}\n"
+        parts.extend(f"- {rec}\n" for rec in recommendations)
         
         # 监控指标建议
-        report += f"""
+        parts.append(f"""
 
 ### 📊 关键监控指标
 - **规模增长率**: 月度账号总数变化
@@ -1774,9 +2104,9 @@ def analyze_comprehensive_business_insights(
 - **月度**: 账号数量和分布变化
 - **季度**: 业务价值和管理效率评估
 - **年度**: 综合成熟度和战略调整评估
-"""
+""")
         
-        return report
+        return "".join(parts)
         
     except Exception as e:
         return f"综合业务洞察分析失败: {str(e)}"
@@ -1792,19 +2122,19 @@ def analyze_partner_overall_business(
     
     try:
         # 加载指定日期的所有账号数据
-        accounts = load_accounts_data(customer, date)
-        analysis = analyze_all_accounts(accounts)
+        _, analysis = load_all_accounts_analysis(customer, date)
+        total_accounts = analysis['total_accounts']
         
         # 生成详细的整体业务分析报告
-        report = f"""# 🏢 {customer} 整体业务分析报告 ({date})
+        parts = [f"""# 🏢 {customer} 整体业务分析报告 ({date})
 
 ## 📊 总体规模概览
-- **账号总数**: {analysis['total_accounts']} 个
-- **Payer账号**: {analysis['total_payers']} 个 ({analysis['total_payers']/analysis['total_accounts']*100:.1f}%)
-- **Linked账号**: {analysis['total_linked']} 个 ({analysis['total_linked']/analysis['total_accounts']*100:.1f}%)
+- **账号总数**: {total_accounts} 个
+- **Payer账号**: {analysis['total_payers']} 个 ({analysis['total_payers']/total_accounts*100:.1f}%)
+- **Linked账号**: {analysis['total_linked']} 个 ({analysis['total_linked']/total_accounts*100:.1f}%)
 
 ## 🎯 支持级别分布
-"""
+"""]
         
         # 支持级别统计
         support_levels = [
@@ -1815,46 +2145,48 @@ def analyze_partner_overall_business(
             ("Other", analysis['total_other'], "❓")
         ]
         
+        # 各支持级别占比只计算一次，业务价值分析中直接复用
+        level_percentages = {level_name: count / total_accounts * 100 for level_name, count, _ in support_levels}
+        
         for level_name, count, icon in support_levels:
             if count > 0:
-                percentage = count / analysis['total_accounts'] * 100
-                report += f"- {icon} **{level_name}**: {count} 个账号 ({percentage:.1f}%)\n"
+                parts.append(f"- {icon} **{level_name}**: {count} 个账号 ({level_percentages[level_name]:.1f}%)\n")
         
         # 业务价值分析
-        report += f"""
+        parts.append(f"""
 
 ## 💰 业务价值分析
-- **高价值客户** (Enterprise): {analysis['total_enterprise']} 个 ({analysis['total_enterprise']/analysis['total_accounts']*100:.1f}%)
-- **中价值客户** (Business): {analysis['total_business']} 个 ({analysis['total_business']/analysis['total_accounts']*100:.1f}%)
-- **开发者客户** (Developer): {analysis['total_developer']} 个 ({analysis['total_developer']/analysis['total_accounts']*100:.1f}%)
-- **基础客户** (Basic): {analysis['total_basic']} 个 ({analysis['total_basic']/analysis['total_accounts']*100:.1f}%)
+- **高价值客户** (Enterprise): {analysis['total_enterprise']} 个 ({level_percentages['Enterprise']:.1f}%)
+- **中价值客户** (Business): {analysis['total_business']} 个 ({level_percentages['Business']:.1f}%)
+- **开发者客户** (Developer): {analysis['total_developer']} 个 ({level_percentages['Developer']:.1f}%)
+- **基础客户** (Basic): {analysis['total_basic']} 个 ({level_percentages['Basic']:.1f}%)
 
 ### 客户结构特征
-"""
+""")
         
         # 分析客户结构特征
-        if analysis['total_enterprise'] > analysis['total_accounts'] * 0.3:
-            report += "- 🏆 **企业级主导型**: Enterprise客户占比较高，属于高价值客户群体\n"
-        elif analysis['total_business'] > analysis['total_accounts'] * 0.4:
-            report += "- 💼 **商业级主导型**: Business客户为主体，具有良好的商业价值\n"
-        elif analysis['total_developer'] > analysis['total_accounts'] * 0.5:
-            report += "- 👨‍💻 **开发者主导型**: Developer客户占主导，具有技术创新潜力\n"
+        if analysis['total_enterprise'] > total_accounts * 0.3:
+            parts.append("- 🏆 **企业级主导型**: Enterprise客户占比较高，属于高价值客户群体\n")
+        elif analysis['total_business'] > total_accounts * 0.4:
+            parts.append("- 💼 **商业级主导型**: Business客户为主体，具有良好的商业价值\n")
+        elif analysis['total_developer'] > total_accounts * 0.5:
+            parts.append("- 👨‍💻 **开发者主导型**: Developer客户占主导，具有技术创新潜力\n")
         else:
-            report += "- 📊 **混合型结构**: 各支持级别分布相对均衡\n"
+            parts.append("- 📊 **混合型结构**: 各支持级别分布相对均衡\n")
         
         # 账号状态分析
-        report += f"""
+        parts.append(f"""
 
 ## 📈 账号状态分析
-"""
+""")
         
-        for status, count in sorted(analysis['status_stats'].items(), key=lambda x: x[1], reverse=True):
+        for status, count in analysis['status_stats'].most_common():
             if count > 0:
-                percentage = count / analysis['total_accounts'] * 100
+                percentage = count / total_accounts * 100
                 status_icon = "✅" if status.lower() == "active" else "⚠️" if status.lower() in ["suspended", "pending"] else "❓"
-                report += f"- {status_icon} **{status}**: {count} 个账号 ({percentage:.1f}%)\n"
+                parts.append(f"- {status_icon} **{status}**: {count} 个账号 ({percentage:.1f}%)\n")
         
-        return report
+        return "".join(parts)
         
     except Exception as e:
         return f"分析客户 {customer} 整体业务情况失败: {str(e)}"
@@ -1868,16 +2200,12 @@ def compare_partner_overall_changes(
     """比较指定客户两个日期之间的整体业务变化（包括所有支持级别）"""
     
     try:
-        # 加载两个日期的所有账号数据
-        accounts1 = load_accounts_data(customer, date1)
-        accounts2 = load_accounts_data(customer, date2)
-        
-        # 分析数据
-        analysis1 = analyze_all_accounts(accounts1)
-        analysis2 = analyze_all_accounts(accounts2)
+        # 加载并分析两个日期的所有账号数据（同一文件版本只分析一次）
+        _, analysis1 = load_all_accounts_analysis(customer, date1)
+        _, analysis2 = load_all_accounts_analysis(customer, date2)
         
         # 生成对比报告
-        report = f"""# 🔄 {customer} 整体业务变化分析 ({date1} → {date2})
+        parts = [f"""# 🔄 {customer} 整体业务变化分析 ({date1} → {date2})
 
 ## 📊 总体变化概览
 - **账号总数**: {analysis1['total_accounts']} → {analysis2['total_accounts']} ({analysis2['total_accounts'] - analysis1['total_accounts']:+d})
@@ -1885,7 +2213,7 @@ def compare_partner_overall_changes(
 - **Linked账号**: {analysis1['total_linked']} → {analysis2['total_linked']} ({analysis2['total_linked'] - analysis1['total_linked']:+d})
 
 ## 🎯 支持级别变化分析
-"""
+"""]
         
         # 支持级别变化对比
         support_changes = [
@@ -1900,54 +2228,54 @@ def compare_partner_overall_changes(
             change = count2 - count1
             if change != 0 or count2 > 0:  # 只显示有变化或有数量的级别
                 change_str = f"({change:+d})" if change != 0 else ""
-                report += f"- {icon} **{level_name}**: {count1} → {count2} {change_str}\n"
+                parts.append(f"- {icon} **{level_name}**: {count1} → {count2} {change_str}\n")
         
         # 业务价值变化分析
-        report += f"""
+        parts.append(f"""
 
 ## 💰 业务价值变化分析
 
 ### 高价值客户变化 (Enterprise)
-"""
+""")
         
         enterprise_change = analysis2['total_enterprise'] - analysis1['total_enterprise']
         if enterprise_change > 0:
-            report += f"- 📈 **增长**: 新增 {enterprise_change} 个Enterprise客户，业务价值提升\n"
+            parts.append(f"- 📈 **增长**: 新增 {enterprise_change} 个Enterprise客户，业务价值提升\n")
         elif enterprise_change < 0:
-            report += f"- 📉 **下降**: 减少 {abs(enterprise_change)} 个Enterprise客户，需要关注客户流失\n"
+            parts.append(f"- 📉 **下降**: 减少 {abs(enterprise_change)} 个Enterprise客户，需要关注客户流失\n")
         else:
-            report += f"- ➡️ **稳定**: Enterprise客户数量保持稳定\n"
+            parts.append(f"- ➡️ **稳定**: Enterprise客户数量保持稳定\n")
         
         # 整体趋势分析
         total_change = analysis2['total_accounts'] - analysis1['total_accounts']
-        report += f"""
+        parts.append(f"""
 
 ## 📈 整体业务趋势分析
 
 ### 规模变化趋势
-"""
+""")
         
         if total_change > 0:
             growth_rate = (total_change / analysis1['total_accounts']) * 100
-            report += f"- 📈 **业务增长**: 总账号数增加 {total_change} 个，增长率 {growth_rate:.1f}%\n"
+            parts.append(f"- 📈 **业务增长**: 总账号数增加 {total_change} 个，增长率 {growth_rate:.1f}%\n")
             
             # 分析增长的主要来源
             max_growth_level = max(support_changes[:-1], key=lambda x: x[2] - x[1])  # 排除Other
             if max_growth_level[2] - max_growth_level[1] > 0:
-                report += f"- 🎯 **主要增长来源**: {max_growth_level[3]} {max_growth_level[0]} 级别贡献最大\n"
+                parts.append(f"- 🎯 **主要增长来源**: {max_growth_level[3]} {max_growth_level[0]} 级别贡献最大\n")
                 
         elif total_change < 0:
             decline_rate = (abs(total_change) / analysis1['total_accounts']) * 100
-            report += f"- 📉 **业务收缩**: 总账号数减少 {abs(total_change)} 个，下降率 {decline_rate:.1f}%\n"
+            parts.append(f"- 📉 **业务收缩**: 总账号数减少 {abs(total_change)} 个，下降率 {decline_rate:.1f}%\n")
             
             # 分析下降的主要原因
             max_decline_level = min(support_changes[:-1], key=lambda x: x[2] - x[1])  # 排除Other
             if max_decline_level[2] - max_decline_level[1] < 0:
-                report += f"- ⚠️ **主要下降来源**: {max_decline_level[3]} {max_decline_level[0]} 级别下降最多\n"
+                parts.append(f"- ⚠️ **主要下降来源**: {max_decline_level[3]} {max_decline_level[0]} 级别下降最多\n")
         else:
-            report += f"- ➡️ **业务稳定**: 总账号数保持不变\n"
+            parts.append(f"- ➡️ **业务稳定**: 总账号数保持不变\n")
         
-        return report
+        return "".join(parts)
         
     except Exception as e:
         return f"比较客户 {customer} 整体业务变化失败: {str(e)}"
@@ -1961,108 +2289,94 @@ def analyze_partner_business_segments(
     
     try:
         # 加载指定日期的所有账号数据
-        accounts = load_accounts_data(customer, date)
-        analysis = analyze_all_accounts(accounts)
+        accounts, analysis = load_all_accounts_analysis(customer, date)
+        total_accounts = analysis['total_accounts']
         
         # 分析业务细分
-        report = f"""# 🏗️ {customer} 业务细分分析报告 ({date})
+        parts = [f"""# 🏗️ {customer} 业务细分分析报告 ({date})
 
 ## 📊 业务线识别 (基于账号标签)
-"""
+"""]
         
-        # 标签分析
-        tag_analysis = {}
+        # 标签分析：每个标签的统计为定长列表，下标依次为
+        # 0 总数、1-5 Enterprise/Business/Developer/Basic/其他级别、6-8 Payer/Linked/其他类型
+        tag_analysis = defaultdict(lambda: [0] * 9)
         tagged_accounts = 0
         
         for account in accounts:
             if account.tags:
                 tagged_accounts += 1
+                # 支持级别和账号类型的下标在加载时已确定，各标签共用
+                level_idx = 1 + account.level_idx
+                role_idx = 6 + account.role_idx
                 # 分割标签（可能有多个标签用分号或逗号分隔）
-                tags = [tag.strip() for tag in account.tags.replace(';', ',').split(',') if tag.strip()]
-                for tag in tags:
-                    if tag not in tag_analysis:
-                        tag_analysis[tag] = {
-                            'total': 0,
-                            'enterprise': 0,
-                            'business': 0,
-                            'developer': 0,
-                            'basic': 0,
-                            'payer': 0,
-                            'linked': 0
-                        }
-                    
-                    tag_analysis[tag]['total'] += 1
-                    if account.is_enterprise():
-                        tag_analysis[tag]['enterprise'] += 1
-                    elif account.is_business():
-                        tag_analysis[tag]['business'] += 1
-                    elif account.is_developer():
-                        tag_analysis[tag]['developer'] += 1
-                    elif account.is_basic():
-                        tag_analysis[tag]['basic'] += 1
-                    
-                    if account.is_payer():
-                        tag_analysis[tag]['payer'] += 1
-                    elif account.is_linked():
-                        tag_analysis[tag]['linked'] += 1
+                for tag in _split_tags(account.tags):
+                    stats = tag_analysis[tag]
+                    stats[0] += 1
+                    stats[level_idx] += 1
+                    stats[role_idx] += 1
         
         if tag_analysis:
-            # 按账号数量排序显示业务线
-            sorted_tags = sorted(tag_analysis.items(), key=lambda x: x[1]['total'], reverse=True)
+            # 按账号数量取前10个业务线显示，无需对全部标签排序
+            sorted_tags = heapq.nlargest(10, tag_analysis.items(), key=lambda x: x[1][0])
             
-            for i, (tag, stats) in enumerate(sorted_tags[:10], 1):  # 显示前10个业务线
-                percentage = stats['total'] / analysis['total_accounts'] * 100
-                report += f"""
-### {i}. 🏷️ **{tag}** ({stats['total']} 个账号, {percentage:.1f}%)
-- 支持级别分布: Enterprise({stats['enterprise']}) | Business({stats['business']}) | Developer({stats['developer']}) | Basic({stats['basic']})
-- 账号类型分布: Payer({stats['payer']}) | Linked({stats['linked']})
-"""
+            for i, (tag, stats) in enumerate(sorted_tags, 1):  # 显示前10个业务线
+                total, enterprise, business, developer, basic, _, payer, linked, _ = stats
+                percentage = total / total_accounts * 100
+                parts.append(f"""
+### {i}. 🏷️ **{tag}** ({total} 个账号, {percentage:.1f}%)
+- 支持级别分布: Enterprise({enterprise}) | Business({business}) | Developer({developer}) | Basic({basic})
+- 账号类型分布: Payer({payer}) | Linked({linked})
+""")
                 
                 # 业务线特征分析
-                if stats['enterprise'] > stats['total'] * 0.5:
-                    report += "- 💎 **高价值业务线**: Enterprise客户占主导\n"
-                elif stats['developer'] > stats['total'] * 0.5:
-                    report += "- 🚀 **创新业务线**: Developer客户为主，具有技术创新特征\n"
-                elif stats['payer'] > stats['linked']:
-                    report += "- 🏢 **独立业务线**: Payer账号较多，业务相对独立\n"
+                if enterprise > total * 0.5:
+                    parts.append("- 💎 **高价值业务线**: Enterprise客户占主导\n")
+                elif developer > total * 0.5:
+                    parts.append("- 🚀 **创新业务线**: Developer客户为主，具有技术创新特征\n")
+                elif payer > linked:
+                    parts.append("- 🏢 **独立业务线**: Payer账号较多，业务相对独立\n")
                 else:
-                    report += "- 🔗 **集成业务线**: Linked账号较多，业务高度集成\n"
+                    parts.append("- 🔗 **集成业务线**: Linked账号较多，业务高度集成\n")
         else:
-            report += "- ❌ **无标签数据**: 当前没有账号使用标签，无法进行业务线分析\n"
+            parts.append("- ❌ **无标签数据**: 当前没有账号使用标签，无法进行业务线分析\n")
+        
+        # 标签使用率只计算一次，报告和规范化程度判断共用
+        tagged_ratio = tagged_accounts / total_accounts
         
         # 业务成熟度分析
-        report += f"""
+        parts.append(f"""
 
 ## 📈 业务成熟度评估
 
 ### 标签使用情况
-- 有标签账号: {tagged_accounts} 个 ({tagged_accounts/analysis['total_accounts']*100:.1f}%)
-- 无标签账号: {analysis['total_accounts'] - tagged_accounts} 个
+- 有标签账号: {tagged_accounts} 个 ({tagged_ratio*100:.1f}%)
+- 无标签账号: {total_accounts - tagged_accounts} 个
 
 ### 管理规范化程度
-"""
-        
-        if tagged_accounts / analysis['total_accounts'] > 0.8:
-            report += "- 🏆 **高度规范化**: 标签使用率超过80%，管理非常规范\n"
-        elif tagged_accounts / analysis['total_accounts'] > 0.5:
-            report += "- 💼 **中度规范化**: 标签使用率超过50%，管理较为规范\n"
-        elif tagged_accounts / analysis['total_accounts'] > 0.2:
-            report += "- 📱 **初步规范化**: 标签使用率超过20%，开始建立管理规范\n"
+""")
+        
+        if tagged_ratio > 0.8:
+            parts.append("- 🏆 **高度规范化**: 标签使用率超过80%，管理非常规范\n")
+        elif tagged_ratio > 0.5:
+            parts.append("- 💼 **中度规范化**: 标签使用率超过50%，管理较为规范\n")
+        elif tagged_ratio > 0.2:
+            parts.append("- 📱 **初步规范化**: 标签使用率超过20%，开始建立管理规范\n")
         else:
-            report += "- ⚠️ **规范化不足**: 标签使用率较低，建议加强账号管理规范\n"
+            parts.append("- ⚠️ **规范化不足**: 标签使用率较低，建议加强账号管理规范\n")
         
         # 业务多样性分析
         unique_tags = len(tag_analysis)
         if unique_tags > 0:
-            diversity_ratio = unique_tags / analysis['total_accounts']
+            diversity_ratio = unique_tags / total_accounts
             if diversity_ratio > 0.3:
-                report += "- 🌈 **高业务多样性**: 业务线丰富，涵盖多个领域\n"
+                parts.append("- 🌈 **高业务多样性**: 业务线丰富，涵盖多个领域\n")
             elif diversity_ratio > 0.1:
-                report += "- 🔄 **中等业务多样性**: 有一定的业务多样性\n"
+                parts.append("- 🔄 **中等业务多样性**: 有一定的业务多样性\n")
             else:
-                report += "- 🎯 **专注型业务**: 业务相对集中，专注特定领域\n"
+                parts.append("- 🎯 **专注型业务**: 业务相对集中，专注特定领域\n")
         
-        return report
+        return "".join(parts)
         
     except Exception as e:
         return f"分析客户 {customer} 业务细分情况失败: {str(e)}"
@@ -2196,8 +2510,7 @@ def get_customer_data_resource(customer: str) -> str:
             return f"客户 {customer} 没有可用数据"
         
         latest_date = dates[-1]
-        accounts = load_enterprise_accounts_data(customer, latest_date)  # 使用Enterprise专用函数
-        analysis = analyze_enterprise_accounts(accounts)
+        accounts, analysis = load_enterprise_analysis(customer, latest_date)  # 使用缓存的Enterprise分析结果
         
         resource_data = f"""# 客户数据资源: {customer}
 
@@ -2228,39 +2541,49 @@ def get_customer_data_resource(customer: str) -> str:
 def get_account_data_resource(customer: str, date: str) -> str:
     """获取特定客户特定日期的原始账号数据资源"""
     try:
-        accounts = load_enterprise_accounts_data(customer, date)  # 使用Enterprise专用函数
-        analysis = analyze_enterprise_accounts(accounts)
+        accounts, analysis = load_enterprise_analysis(customer, date)  # 使用缓存的Enterprise分析结果
         
-        resource_data = f"""# 账号数据资源: {customer} - {date}
+        # 一次遍历统计各项数量，不再为每项计数构建临时列表
+        enterprise_count = active_count = tagged_count = 0
+        for acc in accounts:
+            if acc.is_enterprise():
+                enterprise_count += 1
+            if acc.status == 'Active':
+                active_count += 1
+            if acc.tags:
+                tagged_count += 1
+        
+        parts = [f"""# 账号数据资源: {customer} - {date}
 
 ## 数据概览
 - 数据日期: {date}
 - 总账号数: {len(accounts)}
-- Enterprise账号数: {len([acc for acc in accounts if acc.is_enterprise()])}
+- Enterprise账号数: {enterprise_count}
 
 ## 账号分类统计
 - Payer账号: {analysis['total_payers']} 个
 - Linked账号: {analysis['total_linked']} 个
 
 ## Payer账号列表
-"""
+"""]
         
+        linked_counts = analysis['linked_counts']
         for payer in analysis['payer_accounts'][:10]:  # 显示前10个
-            linked_count = len(analysis['payer_to_linked'].get(payer.account_id, []))
-            resource_data += f"- {payer.account_name} ({payer.account_id}) - {linked_count}个Linked账号\n"
+            linked_count = linked_counts.get(payer.account_id, 0)
+            parts.append(f"- {payer.account_name} ({payer.account_id}) - {linked_count}个Linked账号\n")
         
         if len(analysis['payer_accounts']) > 10:
-            resource_data += f"- ... 还有 {len(analysis['payer_accounts']) - 10} 个Payer账号\n"
+            parts.append(f"- ... 还有 {len(analysis['payer_accounts']) - 10} 个Payer账号\n")
         
-        resource_data += f"""
+        parts.append(f"""
 ## 数据质量
-- 状态为Active的账号: {len([acc for acc in accounts if acc.status == 'Active'])} 个
-- 有标签的账号: {len([acc for acc in accounts if acc.tags])} 个
+- 状态为Active的账号: {active_count} 个
+- 有标签的账号: {tagged_count} 个
 
 ## 原始数据访问
 使用 load_accounts_data('{customer}', '{date}') 获取完整的原始数据。
-"""
-        return resource_data
+""")
+        return "".join(parts)
         
     except Exception as e:
         return f"获取账号数据资源失败: {str(e)}"
@@ -2275,15 +2598,13 @@ def get_customer_summary_resource(customer: str) -> str:
             return f"客户 {customer} 没有可用数据"
         
         latest_date = dates[-1]
-        accounts = load_enterprise_accounts_data(customer, latest_date)  # 使用Enterprise专用函数
-        analysis = analyze_enterprise_accounts(accounts)
+        accounts, analysis = load_enterprise_analysis(customer, latest_date)  # 使用缓存的Enterprise分析结果
         
         # 如果有多个日期，计算变化趋势
         trend_info = ""
         if len(dates) >= 2:
             prev_date = dates[-2]
-            prev_accounts = load_enterprise_accounts_data(customer, prev_date)  # 使用Enterprise专用函数
-            prev_analysis = analyze_enterprise_accounts(prev_accounts)
+            prev_accounts, prev_analysis = load_enterprise_analysis(customer, prev_date)  # 使用缓存的Enterprise分析结果
             
             payer_change = analysis['total_payers'] - prev_analysis['total_payers']
             linked_change = analysis['total_linked'] - prev_analysis['total_linked']
@@ -2294,7 +2615,7 @@ def get_customer_summary_resource(customer: str) -> str:
 - Linked账号变化: {linked_change:+d} 个
 """
         
-        summary_data = f"""# 客户摘要: {customer} (最新数据)
+        parts = [f"""# 客户摘要: {customer} (最新数据)
 
 ## 当前状态 ({latest_date})
 - Payer账号: {analysis['total_payers']} 个
@@ -2304,20 +2625,20 @@ def get_customer_summary_resource(customer: str) -> str:
 {trend_info}
 
 ## 前5大Payer账号
-"""
-        
-        # 按Linked账号数量排序显示前5个Payer
-        payer_with_counts = []
-        for payer in analysis['payer_accounts']:
-            linked_count = len(analysis['payer_to_linked'].get(payer.account_id, []))
-            payer_with_counts.append((payer, linked_count))
+"""]
         
-        payer_with_counts.sort(key=lambda x: x[1], reverse=True)
+        # 按Linked账号数量取前5个Payer，只需部分排序
+        linked_counts = analysis['linked_counts']
+        payer_with_counts = (
+            (payer, linked_counts.get(payer.account_id, 0))
+            for payer in analysis['payer_accounts']
+        )
+        top_payers = heapq.nlargest(5, payer_with_counts, key=itemgetter(1))
         
-        for i, (payer, linked_count) in enumerate(payer_with_counts[:5], 1):
-            summary_data += f"{i}. {payer.account_name} ({payer.account_id}) - {linked_count}个Linked账号\n"
+        for i, (payer, linked_count) in enumerate(top_payers, 1):
+            parts.append(f"{i}. {payer.account_name} ({payer.account_id}) - {linked_count}个Linked账号\n")
         
-        summary_data += f"""
+        parts.append(f"""
 ## 数据完整性
 - 可用数据日期: {len(dates)} 个 ({dates[0]} 至 {dates[-1]})
 - 最新更新: {latest_date}
@@ -2326,8 +2647,8 @@ def get_customer_summary_resource(customer: str) -> str:
 - 使用 compare_payer_changes() 分析账号变化
 - 使用 get_detailed_linked_changes() 获取详细变化信息
 - 使用 track_account_history() 追踪特定账号历史
-"""
-        return summary_data
+""")
+        return "".join(parts)
         
     except Exception as e:
         return f"获取客户摘要资源失败: {str(e)}"
@@ -2542,14 +2863,13 @@ def main():
     print("🚀 启动 Account Analyzer MCP服务器 (深度分析增强版)...")
     print(f"📁 数据根目录: {DATA_ROOT_DIR}")
     
-    # 检查数据目录
-    if os.path.exists(DATA_ROOT_DIR):
+    # 检查数据目录；扫描结果写入缓存，后续工具调用直接复用
+    if os.path.isdir(DATA_ROOT_DIR):
         customers = get_available_customers()
         print(f"🏢 发现 {len(customers)} 个客户: {', '.join(customers)}")
         
         for customer in customers:
-            dates = get_available_dates(customer)
-            print(f"   📅 {customer}: {len(dates)} 个数据文件")
+            print(f"   📅 {customer}: {len(_customer_file_index(customer))} 个数据文件")
     else:
         print(f"⚠️  数据根目录不存在: {DATA_ROOT_DIR}")
     